@@ -0,0 +1,194 @@
+import base64
+import binascii
+import json
+import random
+import re
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+WORDS = (
+    "the team reported progress on the release while a blocker in the payment flow remains open "
+    "and the database migration is scheduled after the upgrade with risks around latency"
+).split()
+
+
+def _eventstream_message(headers: dict, payload: bytes) -> bytes:
+    """
+    Encodes one AWS event stream message (string headers only), as used by
+    InvokeModelWithResponseStream.
+    """
+    encoded_headers = b""
+    for name, value in headers.items():
+        name_bytes, value_bytes = name.encode(), value.encode()
+        encoded_headers += struct.pack("!B", len(name_bytes)) + name_bytes
+        encoded_headers += struct.pack("!BH", 7, len(value_bytes)) + value_bytes
+
+    total_length = 12 + len(encoded_headers) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(encoded_headers))
+    prelude += struct.pack("!I", binascii.crc32(prelude) & 0xFFFFFFFF)
+    message = prelude + encoded_headers + payload
+    return message + struct.pack("!I", binascii.crc32(message) & 0xFFFFFFFF)
+
+
+def _chunk_event(data: dict) -> bytes:
+    payload = json.dumps({"bytes": base64.b64encode(json.dumps(data).encode()).decode()}).encode()
+    return _eventstream_message(
+        {":event-type": "chunk", ":content-type": "application/json", ":message-type": "event"},
+        payload,
+    )
+
+
+class FakeBedrockServer:
+    """
+    Local stand-in for the bedrock-runtime InvokeModel / InvokeModelWithResponseStream APIs.
+
+    Claude calls get a canned answer of `output_tokens` words (JSON when the prompt asks for it);
+    Titan embedding calls get a deterministic vector of `embedding_dims` floats.
+
+    - latency_ms: time to first byte; streamed answers then emit one chunk every token_interval_ms.
+    - throttle_rate: fraction of requests answered with ThrottlingException (HTTP 429).
+    - calls: Counter of requests per kind ('claude', 'claude_stream', 'embedding').
+    """
+
+    def __init__(self, latency_ms: float = 0, token_interval_ms: float = 0, output_tokens: int = 60,
+                 embedding_dims: int = 256, throttle_rate: float = 0.0, port: int = 0):
+        self.latency_ms = latency_ms
+        self.token_interval_ms = token_interval_ms
+        self.output_tokens = output_tokens
+        self.embedding_dims = embedding_dims
+        self.throttle_rate = throttle_rate
+        self.calls = Counter()
+        self.input_tokens = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self) -> "FakeBedrockServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "total": sum(self.calls.values()),
+                "throttled": self.throttled,
+                "input_tokens": self.input_tokens,
+            }
+
+    def _answer(self, body: dict) -> str:
+        """
+        Plausible output for the prompts this server sends, so tools complete their happy path.
+        """
+        system = body.get("system", "")
+        user = body["messages"][0]["content"][0]["text"]
+        if "structured JSON" in system:
+            match = re.search(r"Allowed project keys:\s*\n([A-Z0-9_]+)", user)
+            project = match.group(1) if match else "P1"
+            return json.dumps({"jql": f'project = "{project}" AND resolution = Unresolved ORDER BY created DESC', "max_results": 10})
+        if "time_from" in system:
+            return '{"time_from": "2025-01-01", "time_to": "2025-01-31"}'
+        if "project keys" in system:
+            match = re.search(r"\(key: ([A-Z0-9_]+)\)", user)
+            return match.group(1) if match else "P1"
+        return " ".join(WORDS[i % len(WORDS)] for i in range(self.output_tokens))
+
+    def _embedding(self, text: str) -> list[float]:
+        rng = random.Random(text)
+        return [rng.uniform(-1, 1) for _ in range(self.embedding_dims)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict, headers: dict = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                path = unquote(urlparse(self.path).path)
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                match = re.fullmatch(r"/model/(.+)/(invoke|invoke-with-response-stream)", path)
+                if not match:
+                    return self._send_json(404, {"message": f"Unknown path {path}"})
+                streaming = match.group(2) != "invoke"
+
+                if "inputText" in body:
+                    kind, text = "embedding", body["inputText"]
+                else:
+                    kind = "claude_stream" if streaming else "claude"
+                    text = body.get("system", "") + body["messages"][0]["content"][0]["text"]
+
+                with server._lock:
+                    server.calls[kind] += 1
+                    server.input_tokens += len(text) // 4 + 1
+                    throttle = server._rng.random() < server.throttle_rate
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+
+                if throttle:
+                    with server._lock:
+                        server.throttled += 1
+                    return self._send_json(429, {"message": "Too many requests, please wait before trying again."},
+                                           {"x-amzn-ErrorType": "ThrottlingException"})
+
+                if kind == "embedding":
+                    return self._send_json(200, {
+                        "embedding": server._embedding(text),
+                        "inputTextTokenCount": len(text) // 4 + 1,
+                    })
+
+                answer = server._answer(body)
+                if not streaming:
+                    return self._send_json(200, {
+                        "type": "message",
+                        "role": "assistant",
+                        "content": [{"type": "text", "text": answer}],
+                        "usage": {"input_tokens": len(text) // 4 + 1, "output_tokens": len(answer.split())},
+                    })
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def write(data: bytes):
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+
+                try:
+                    write(_chunk_event({"type": "message_start", "message": {"usage": {"input_tokens": len(text) // 4 + 1}}}))
+                    for word in answer.split(" "):
+                        if server.token_interval_ms:
+                            time.sleep(server.token_interval_ms / 1000)
+                        write(_chunk_event({"type": "content_block_delta", "index": 0,
+                                            "delta": {"type": "text_delta", "text": word + " "}}))
+                    write(_chunk_event({"type": "message_delta", "usage": {"output_tokens": len(answer.split())}}))
+                    write(_chunk_event({"type": "message_stop"}))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # the client stopped reading the stream
+
+        return Handler
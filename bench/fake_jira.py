@@ -0,0 +1,314 @@
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+API = "/rest/api/2/"
+
+STATUSES = ["To Do", "In Progress", "In Review", "Done"]
+PRIORITIES = ["Highest", "High", "Medium", "Low", "Lowest"]
+ISSUE_TYPES = ["Bug", "Task", "Story", "Epic"]
+PEOPLE = ["Ada Lovelace", "Alan Turing", "Grace Hopper", "Edsger Dijkstra", "Barbara Liskov"]
+WORDS = (
+    "login payment timeout error deploy release database cache latency report export import "
+    "customer invoice dashboard migration upgrade outage alert permission sync search index"
+).split()
+
+# Comments embedded in an issue's `comment` field; the rest must be paged via /comment
+EMBEDDED_COMMENTS = 50
+BASE_TIME = datetime(2025, 1, 1, 9, 0)
+
+
+@dataclass
+class JiraDataset:
+    """
+    Deterministic synthetic Jira content. Issues and comments are generated on demand
+    from their key, so large scenarios cost no memory up front.
+    """
+
+    projects: int = 5
+    issues_per_project: int = 50
+    comments_per_issue: int = 5
+    description_chars: int = 500
+    comment_chars: int = 200
+
+    def __post_init__(self):
+        self._project_keys = [f"P{i}" for i in range(1, self.projects + 1)]
+        self._project_set = set(self._project_keys)
+
+    def project_keys(self) -> list[str]:
+        return self._project_keys
+
+    def project(self, key: str) -> dict:
+        rng = random.Random(key)
+        return {
+            "id": key[1:],
+            "key": key,
+            "name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {key}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(20)),
+            "projectCategory": {"name": rng.choice(["Internal", "Customer", "Platform"])},
+        }
+
+    def issue_keys(self, project_key: str) -> list[str]:
+        return [f"{project_key}-{n}" for n in range(1, self.issues_per_project + 1)]
+
+    def exists(self, key: str) -> bool:
+        project_key, _, number = key.rpartition("-")
+        return project_key in self._project_set and number.isdigit() and 1 <= int(number) <= self.issues_per_project
+
+    @staticmethod
+    def _text(rng: random.Random, chars: int) -> str:
+        words = []
+        while sum(len(w) + 1 for w in words) < chars:
+            words.append(rng.choice(WORDS))
+        return " ".join(words)[:chars]
+
+    @staticmethod
+    def _timestamp(moment: datetime) -> str:
+        return moment.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+    def _user(self, rng: random.Random) -> dict:
+        name = rng.choice(PEOPLE)
+        return {"name": name.split()[0].lower(), "displayName": name}
+
+    def comment(self, key: str, index: int) -> dict:
+        rng = random.Random(f"{key}/comment/{index}")
+        created = BASE_TIME + timedelta(hours=index)
+        return {
+            "id": str(index + 1),
+            "author": self._user(rng),
+            "body": self._text(rng, self.comment_chars),
+            "created": self._timestamp(created),
+            "updated": self._timestamp(created),
+        }
+
+    def comments(self, key: str, start_at: int, max_results: int) -> list[dict]:
+        end = min(self.comments_per_issue, start_at + max_results)
+        return [self.comment(key, i) for i in range(start_at, end)]
+
+    def issue_number(self, key: str) -> int:
+        return int(key.rpartition("-")[2])
+
+    def updated(self, key: str) -> datetime:
+        return BASE_TIME + timedelta(hours=self.issue_number(key) * 3)
+
+    def issue(self, key: str, base_url: str, fields: set) -> dict:
+        rng = random.Random(key)
+        project_key = key.rpartition("-")[0]
+        created = BASE_TIME + timedelta(hours=self.issue_number(key))
+        status = rng.choice(STATUSES)
+        all_fields = {
+            "summary": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {rng.choice(WORDS)} in {project_key}",
+            "description": self._text(rng, self.description_chars),
+            "status": {"name": status},
+            "priority": {"name": rng.choice(PRIORITIES)},
+            "assignee": self._user(rng) if rng.random() < 0.8 else None,
+            "reporter": self._user(rng),
+            "created": self._timestamp(created),
+            "updated": self._timestamp(self.updated(key)),
+            "issuetype": {"name": rng.choice(ISSUE_TYPES)},
+            "project": {"key": project_key, "name": self.project(project_key)["name"]},
+            "resolution": {"name": "Done"} if status == "Done" else None,
+        }
+        data = {name: value for name, value in all_fields.items() if "*all" in fields or name in fields}
+        if "*all" in fields or "comment" in fields:
+            data["comment"] = {
+                "comments": self.comments(key, 0, EMBEDDED_COMMENTS),
+                "maxResults": EMBEDDED_COMMENTS,
+                "total": self.comments_per_issue,
+                "startAt": 0,
+            }
+        return {"id": str(zlib.crc32(key.encode())), "key": key, "self": f"{base_url}{API}issue/{key}", "fields": data}
+
+    def search(self, jql: str) -> list[str]:
+        """
+        Evaluates the subset of JQL the server emits: `key in (...)`, `key = X`,
+        `project = X` / `project IN (...)` and `ORDER BY created|updated ASC|DESC`.
+        Other clauses are ignored (they only narrow results in real Jira).
+        """
+        parts = re.split(r"\border\s+by\b", jql, maxsplit=1, flags=re.I)
+        query, order = parts[0], parts[1] if len(parts) > 1 else ""
+
+        keys = None
+        match = re.search(r"\bkey\s+in\s*\(([^)]*)\)", query, re.I)
+        if match:
+            keys = [k.strip().strip('"').upper() for k in match.group(1).split(",")]
+        match = re.search(r'\bkey\s*=\s*"?([A-Z0-9_]+-\d+)"?', query, re.I)
+        if match:
+            keys = [match.group(1).upper()]
+
+        projects = self.project_keys()
+        match = re.search(r"\bproject\s+in\s*\(([^)]*)\)", query, re.I)
+        if match:
+            projects = [p.strip().strip('"').upper() for p in match.group(1).split(",")]
+        match = re.search(r'\bproject\s*=\s*"?([A-Za-z0-9_]+)"?', query, re.I)
+        if match:
+            projects = [match.group(1).upper()]
+
+        if keys is not None:
+            result = [k for k in keys if self.exists(k) and k.rpartition("-")[0] in projects]
+        else:
+            result = [k for p in projects if p in self._project_set for k in self.issue_keys(p)]
+
+        match = re.search(r"(created|updated)\s*(asc|desc)?", order or "", re.I)
+        if match:
+            # created and updated both grow with the issue number in this dataset
+            result.sort(key=self.issue_number, reverse=(match.group(2) or "asc").lower() == "desc")
+        return result
+
+
+class FakeJiraServer:
+    """
+    Local stand-in for the Jira Server REST API v2 endpoints this MCP server uses.
+
+    - latency_ms: added to every response (plus jitter_ms of uniform noise).
+    - throttle_rate: fraction of requests answered with 429 and `Retry-After: retry_after`.
+    - calls: Counter of requests per endpoint (e.g. 'search', 'issue', 'issue/comment').
+    """
+
+    def __init__(self, dataset: JiraDataset, latency_ms: float = 0, jitter_ms: float = 0,
+                 throttle_rate: float = 0.0, retry_after: float = 1.0, port: int = 0):
+        self.dataset = dataset
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.calls = Counter()
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self) -> "FakeJiraServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"calls": dict(self.calls), "total": sum(self.calls.values()), "throttled": self.throttled}
+
+    def _route(self, path: str, params: dict):
+        dataset, base = self.dataset, self.url
+        if path == "/rest/auth/1/session":
+            return "session", {"name": "bench"}
+        if not path.startswith(API):
+            return "unknown", None
+        path = path[len(API):].strip("/")
+
+        def param(name, default=None):
+            return params.get(name, [default])[0]
+
+        def requested_fields() -> set:
+            # the client sends fields either comma-separated or as repeated parameters
+            return {f for value in params.get("fields", ["*all"]) for f in value.split(",") if f}
+
+        if path == "serverInfo":
+            return "serverInfo", {
+                "baseUrl": base, "version": "9.12.0", "versionNumbers": [9, 12, 0],
+                "deploymentType": "Server", "serverTitle": "Fake Jira",
+            }
+        if path == "myself":
+            return "myself", {"name": "bench", "displayName": "Bench User"}
+        if path == "field":
+            return "field", [
+                {"id": name, "key": name, "name": name.title(), "custom": False, "navigable": True, "searchable": True,
+                 "clauseNames": [name]}
+                for name in ("summary", "description", "status", "priority", "assignee", "reporter",
+                             "created", "updated", "issuetype", "project", "resolution", "comment")
+            ]
+        if path == "project":
+            return "project", [dataset.project(key) for key in dataset.project_keys()]
+        if path == "priority":
+            return "priority", [{"id": str(i), "name": name} for i, name in enumerate(PRIORITIES, 1)]
+        if path == "status":
+            return "status", [{"id": str(i), "name": name} for i, name in enumerate(STATUSES, 1)]
+        if path == "issuetype":
+            return "issuetype", [{"id": str(i), "name": name} for i, name in enumerate(ISSUE_TYPES, 1)]
+
+        if path == "search":
+            keys = dataset.search(param("jql", ""))
+            start_at = int(param("startAt", 0))
+            max_results = int(param("maxResults", 50))
+            fields = requested_fields()
+            page = keys[start_at:start_at + max_results]
+            return "search", {
+                "startAt": start_at, "maxResults": max_results, "total": len(keys),
+                "issues": [dataset.issue(key, base, fields) for key in page],
+            }
+
+        match = re.fullmatch(r"issue/([A-Za-z0-9_]+-\d+)(?:/(comment|transitions))?", path)
+        if match:
+            key, sub = match.group(1).upper(), match.group(2)
+            if not dataset.exists(key):
+                return f"issue/{sub}" if sub else "issue", 404
+            if sub == "comment":
+                start_at = int(param("startAt", 0))
+                max_results = int(param("maxResults", 50))
+                return "issue/comment", {
+                    "startAt": start_at, "maxResults": max_results, "total": dataset.comments_per_issue,
+                    "comments": dataset.comments(key, start_at, max_results),
+                }
+            if sub == "transitions":
+                return "issue/transitions", {
+                    "transitions": [{"id": str(i), "name": s, "to": {"name": s}} for i, s in enumerate(STATUSES, 1)]
+                }
+            fields = requested_fields()
+            return "issue", dataset.issue(key, base, fields)
+
+        return "unknown", None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body, headers: dict = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint, body = server._route(unquote(url.path), parse_qs(url.query))
+
+                with server._lock:
+                    server.calls[endpoint] += 1
+                    throttle = server._rng.random() < server.throttle_rate
+                    delay = server.latency_ms + server._rng.uniform(0, server.jitter_ms)
+                if delay:
+                    time.sleep(delay / 1000)
+
+                if throttle:
+                    with server._lock:
+                        server.throttled += 1
+                    return self._send(429, {"errorMessages": ["Rate limit exceeded."]},
+                                      {"Retry-After": str(server.retry_after)})
+                if body is None or body == 404:
+                    return self._send(404, {"errorMessages": [f"Not found: {url.path}"], "errors": {}})
+                self._send(200, body)
+
+            do_POST = do_GET
+
+        return Handler
@@ -0,0 +1,37 @@
+"""
+Runs the server modules offline against the fake Jira and Bedrock servers.
+Shared by the benchmark and the offline tests in test/.
+"""
+import os
+import tempfile
+
+
+def disable_dotenv() -> None:
+    """
+    The server modules call load_dotenv(override=True) on import; a developer's .env must not
+    redirect offline runs to real services. Call before importing them.
+    """
+    import dotenv
+    dotenv.load_dotenv = lambda *a, **k: False
+
+
+def use_fakes(jira_server, bedrock_server, **env) -> None:
+    """
+    Points the configuration main/helpers read on import at the fakes (plus any `env` overrides),
+    with a fresh cache directory and the issue mirror disabled.
+    """
+    os.environ.update({
+        "JIRA_BASE_URL": jira_server.url,
+        "JIRA_EMAIL": "bench",
+        "JIRA_API_TOKEN": "bench",
+        "BEDROCK_ENDPOINT_URL": bedrock_server.url,
+        "BEDROCK_MODEL_ID": "anthropic.claude-bench",
+        "AWS_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+        "MCP_CACHE_DIR": tempfile.mkdtemp(prefix="mcp-bench-"),
+        **env,
+    })
+    if "JIRA_MIRROR_PROJECTS" not in env:
+        os.environ.pop("JIRA_MIRROR_PROJECTS", None)
+    disable_dotenv()
@@ -0,0 +1,245 @@
+"""
+Load generator: replays a trace of tool calls against a running MCP server.
+
+A trace is JSONL, one call per line: {"tool": "get_issue", "arguments": {"key": "DEV-1"}}
+(an optional "offset" in seconds from the start is honored with --replay-timing).
+Without --trace, a synthetic trace is built from --mix.
+
+Closed loop (--concurrency N): N callers each send their next call as soon as the previous
+one returns. Open loop (--rate R): calls arrive as a Poisson process at R per second no
+matter how slowly the server answers, up to --max-in-flight outstanding calls.
+
+Usage (from the repository root, with the server running):
+    python -m bench.load --concurrency 16 --duration 60
+    python -m bench.load --rate 20 --duration 120 --mix get_issue=6,execute_jql_query=3,summarize_jira_tickets=1
+    python -m bench.load --trace calls.jsonl --replay-timing --server http://replica:8001/sse/
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+from fastmcp.client import Client
+
+from bench.run import percentile
+
+DEFAULT_SERVER = "http://127.0.0.1:8001/sse/"
+DEFAULT_MIX = "get_issue=5,get_issues=2,execute_jql_query=2,search_advanced_issues=1,summarize_jira_tickets=1"
+
+
+def synthetic_arguments(tool: str, project: str, issue_keys: list[str], rng: random.Random) -> dict:
+    """
+    Plausible arguments for the tools a synthetic trace can contain.
+    """
+    key = rng.choice(issue_keys)
+    return {
+        "get_issue": {"key": key},
+        "get_issue_with_comments": {"key": key},
+        "get_issues": {"keys": rng.sample(issue_keys, min(len(issue_keys), 10))},
+        "get_available_issue_statuses": {"key": key},
+        "search_issues": {"jql": f'project = "{project}" ORDER BY updated DESC', "max_results": 20},
+        "search_advanced_issues": {"projects": [project], "max_results": 20},
+        "execute_jql_query": {"jql": f'project = "{project}" ORDER BY created DESC', "max_results": 200},
+        "summarize_jira_tickets": {"ticket_keys": rng.sample(issue_keys, min(len(issue_keys), 5))},
+        "semantic_search_issues": {"query": "login fails after password reset", "projects": [project], "k": 5},
+        "resolve_project_key": {"human_input": project.lower()},
+        "generate_jql_from_input": {"user_input": f"open bugs in {project}"},
+        "parse_jira_date": {"input_str": "-1w"},
+        "list_projects": {},
+        "get_all_issue_types": {},
+    }[tool]
+
+
+def synthetic_trace(mix: str, project: str, issue_keys: list[str], length: int, seed: int) -> list[dict]:
+    weights = {}
+    for part in mix.split(","):
+        tool, _, weight = part.partition("=")
+        weights[tool.strip()] = float(weight or 1)
+
+    rng = random.Random(seed)
+    tools = rng.choices(list(weights), weights=list(weights.values()), k=length)
+    return [{"tool": tool, "arguments": synthetic_arguments(tool, project, issue_keys, rng)} for tool in tools]
+
+
+def load_trace(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.first_error = {}
+
+    def record(self, tool: str, seconds: float, error) -> None:
+        self.latencies[tool].append(seconds * 1000)
+        if error:
+            self.errors[tool] += 1
+            self.first_error.setdefault(tool, error[:300])
+
+    def report(self, elapsed: float) -> dict:
+        def summary(latencies: list[float], errors: int) -> dict:
+            return {
+                "calls": len(latencies),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+                "throughput_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                "latency_ms": {
+                    "p50": round(percentile(latencies, 50), 2),
+                    "p90": round(percentile(latencies, 90), 2),
+                    "p95": round(percentile(latencies, 95), 2),
+                    "p99": round(percentile(latencies, 99), 2),
+                    "max": round(max(latencies), 2),
+                    "mean": round(sum(latencies) / len(latencies), 2),
+                } if latencies else None,
+            }
+
+        everything = [ms for latencies in self.latencies.values() for ms in latencies]
+        tools = {tool: summary(latencies, self.errors[tool]) for tool, latencies in sorted(self.latencies.items())}
+        for tool, error in self.first_error.items():
+            tools[tool]["first_error"] = error
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "overall": summary(everything, sum(self.errors.values())),
+            "tools": tools,
+        }
+
+
+async def call(client: Client, entry: dict, recorder: Recorder, timeout: float) -> None:
+    started = time.perf_counter()
+    try:
+        result = await client.call_tool(entry["tool"], entry.get("arguments", {}), timeout=timeout, raise_on_error=False)
+        error = (result.content[0].text if result.content else "error") if result.is_error else None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    recorder.record(entry["tool"], time.perf_counter() - started, error)
+
+
+async def closed_loop(clients: list, trace: list[dict], args, recorder: Recorder) -> None:
+    calls = itertools.cycle(trace) if args.duration else iter(trace)
+    deadline = time.monotonic() + args.duration if args.duration else None
+
+    async def worker(client: Client):
+        for entry in calls:  # shared iterator: each entry is taken by exactly one worker
+            if deadline and time.monotonic() >= deadline:
+                return
+            await call(client, entry, recorder, args.timeout)
+
+    await asyncio.gather(*(worker(clients[i % len(clients)]) for i in range(args.concurrency)))
+
+
+async def open_loop(clients: list, trace: list[dict], args, recorder: Recorder) -> None:
+    rng = random.Random(args.seed)
+    in_flight = asyncio.Semaphore(args.max_in_flight)
+    tasks = set()
+    start = time.monotonic()
+    deadline = start + args.duration if args.duration else None
+    next_arrival = start
+
+    for i, entry in enumerate(itertools.cycle(trace) if args.duration else trace):
+        if args.replay_timing and "offset" in entry:
+            next_arrival = start + entry["offset"]
+        elif args.rate:
+            next_arrival += rng.expovariate(args.rate)
+        if deadline and next_arrival >= deadline:
+            break
+        await asyncio.sleep(max(0.0, next_arrival - time.monotonic()))
+
+        await in_flight.acquire()
+
+        async def run(entry=entry, client=clients[i % len(clients)]):
+            try:
+                await call(client, entry, recorder, args.timeout)
+            finally:
+                in_flight.release()
+
+        task = asyncio.create_task(run())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks)
+
+
+async def run_load(args) -> dict:
+    if args.trace:
+        trace = load_trace(args.trace)
+    else:
+        issue_keys = args.issue_keys.split(",") if args.issue_keys else [f"{args.project}-{n}" for n in range(1, 21)]
+        trace = synthetic_trace(args.mix, args.project, issue_keys, args.length, args.seed)
+        if args.record_trace:
+            with open(args.record_trace, "w") as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in trace)
+
+    clients = [Client(args.server) for _ in range(max(1, args.clients))]
+    for client in clients:
+        await client.__aenter__()
+    recorder = Recorder()
+    try:
+        started = time.perf_counter()
+        if args.rate or args.replay_timing:
+            await open_loop(clients, trace, args, recorder)
+        else:
+            await closed_loop(clients, trace, args, recorder)
+        elapsed = time.perf_counter() - started
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+
+    report = recorder.report(elapsed)
+    report["settings"] = {
+        "server": args.server,
+        "mode": "open" if args.rate or args.replay_timing else "closed",
+        "concurrency": args.concurrency,
+        "rate_per_second": args.rate,
+        "clients": args.clients,
+        "trace": args.trace or f"synthetic:{args.mix}",
+        "trace_length": len(trace),
+        "duration_seconds": args.duration,
+    }
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay tool-call traces against a running MCP server.")
+    parser.add_argument("--server", default=DEFAULT_SERVER, help="Server URL (or a path to a server script)")
+    parser.add_argument("--trace", help="JSONL trace to replay; synthetic when omitted")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Synthetic trace weights, e.g. get_issue=5,execute_jql_query=2")
+    parser.add_argument("--project", default="DELTP", help="Project key used by the synthetic trace")
+    parser.add_argument("--issue-keys", help="Comma-separated issue keys for the synthetic trace (default PROJECT-1..20)")
+    parser.add_argument("--length", type=int, default=500, help="Synthetic trace length")
+    parser.add_argument("--record-trace", help="Write the synthetic trace here for later replays")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed loop: callers in flight")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open loop: mean arrivals per second")
+    parser.add_argument("--replay-timing", action="store_true", help="Open loop: send calls at their trace 'offset'")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Open loop: cap on outstanding calls")
+    parser.add_argument("--clients", type=int, default=4, help="MCP sessions the calls are spread over")
+    parser.add_argument("--duration", type=float, default=0.0, help="Seconds to run, cycling the trace (0: play it once)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-call timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run_load(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    print(
+        f"[load] {report['overall']['calls']} calls in {report['elapsed_seconds']}s "
+        f"({report['overall']['throughput_per_second']}/s, {report['overall']['errors']} errors)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
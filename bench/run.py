@@ -0,0 +1,303 @@
+"""
+Offline benchmark for the MCP tools in main.py.
+
+Every scenario runs in a fresh child process against local stand-ins for Jira
+(bench/fake_jira.py) and Bedrock (bench/fake_bedrock.py), calling the tools through
+an in-memory fastmcp Client. Output is JSON (per tool: p50/p95/p99 latency, upstream
+calls per run, peak traced memory of one extra traced call) meant to be diffed across commits.
+Each call starts only once the fakes have gone quiet, so background work (index builds,
+vector syncs) started by an earlier call is not measured against it.
+
+Usage (from the repository root):
+    python -m bench.run
+    python -m bench.run --scenario long_comments --iterations 20 --output bench.json
+    python -m bench.run --jira-latency-ms 300 --jira-throttle-rate 0.05 --bedrock-latency-ms 800
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    # Project resolution, metadata and list tools over a wide instance
+    "many_projects": {"projects": 400, "issues_per_project": 10, "comments_per_issue": 3},
+    # Pagination-heavy tools over big result sets
+    "large_results": {"projects": 3, "issues_per_project": 3000, "comments_per_issue": 2, "description_chars": 300},
+    # Comment pagination and summarization of long threads
+    "long_comments": {"projects": 2, "issues_per_project": 40, "comments_per_issue": 400, "comment_chars": 600},
+}
+
+# Tools that mutate server state and would distort every later measurement
+SKIPPED_TOOLS = {"invalidate_metadata_cache": "drops caches the other cases rely on"}
+
+
+def tool_cases(scenario: str, dataset) -> list[tuple[str, str, dict]]:
+    """
+    (label, tool, arguments) for every tool; labels differ from the tool name for variants.
+    """
+    project = dataset.project_keys()[0]
+    keys = dataset.issue_keys(project)[:20]
+    project_name = dataset.project(project)["name"]
+    window = 5000 if scenario == "large_results" else 500
+
+    return [
+        ("search_issues", "search_issues", {"jql": f'project = "{project}"', "max_results": 50}),
+        ("get_issue", "get_issue", {"key": keys[0]}),
+        ("get_issues", "get_issues", {"keys": keys}),
+        ("get_issue_with_comments", "get_issue_with_comments", {"key": keys[0]}),
+        ("get_available_issue_statuses", "get_available_issue_statuses", {"key": keys[0]}),
+        ("list_projects", "list_projects", {}),
+        ("get_all_issue_types", "get_all_issue_types", {}),
+        ("search_advanced_issues", "search_advanced_issues", {"projects": [project], "max_results": 50}),
+        ("semantic_search_issues", "semantic_search_issues", {"query": "payment timeout after deploy", "projects": [project], "k": 5}),
+        ("resolve_project_key", "resolve_project_key", {"human_input": project_name.lower()}),
+        ("resolve_project_key[fuzzy]", "resolve_project_key", {"human_input": project_name.split()[0].lower()}),
+        ("parse_jira_date", "parse_jira_date", {"input_str": "1 Jul 2025"}),
+        ("generate_jql_from_input", "generate_jql_from_input", {"user_input": f"open issues in {project}, top 10"}),
+        ("execute_jql_query", "execute_jql_query", {"jql": f'project = "{project}"', "max_results": window}),
+        ("execute_jql_query[parallel]", "execute_jql_query", {"jql": f'project = "{project}"', "max_results": window, "parallel_pages": 8}),
+        ("summarize_jira_tickets", "summarize_jira_tickets", {"ticket_keys": keys[:10]}),
+        ("get_cache_stats", "get_cache_stats", {}),
+    ]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _diff_calls(before: dict, after: dict) -> int:
+    return after["total"] - before["total"]
+
+
+async def _call(client, tool: str, arguments: dict):
+    """
+    Calls one tool and returns the error text, or None on success.
+    """
+    try:
+        result = await client.call_tool(tool, arguments, raise_on_error=False)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    if not result.is_error:
+        return None
+    return result.content[0].text if result.content else "error"
+
+
+async def _wait_for_quiet(jira_server, bedrock_server, quiet_seconds: float, timeout: float = 600.0) -> None:
+    """
+    Waits until neither fake has received a request for `quiet_seconds`, so background work an
+    earlier call started (index builds, vector syncs, cache refreshes) is not counted against the next call.
+    """
+    deadline = time.monotonic() + timeout
+    last = None
+    while time.monotonic() < deadline:
+        current = (jira_server.snapshot()["total"], bedrock_server.snapshot()["total"])
+        if current == last:
+            return
+        last = current
+        await asyncio.sleep(quiet_seconds)
+
+
+async def _measure_memory(client, cases, settle) -> dict:
+    """
+    One extra call per case under tracemalloc, which slows Python down too much to run during
+    the latency pass. Returns label -> peak bytes allocated above the pre-call baseline.
+    """
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for label, tool, arguments in cases:
+            await settle()
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+            await _call(client, tool, arguments)
+            peaks[label] = tracemalloc.get_traced_memory()[1] - traced_before
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+async def _measure(client, cases, iterations: int, warmup: int, jira_server, bedrock_server, quiet_seconds: float) -> dict:
+    async def settle():
+        await _wait_for_quiet(jira_server, bedrock_server, quiet_seconds)
+
+    samples = {label: {"tool": tool, "latencies": [], "jira": [], "bedrock": [], "errors": 0, "error": None}
+               for label, tool, _ in cases}
+
+    for iteration in range(warmup + iterations):
+        for label, tool, arguments in cases:
+            await settle()
+            jira_before, bedrock_before = jira_server.snapshot(), bedrock_server.snapshot()
+            started = time.perf_counter()
+            error = await _call(client, tool, arguments)
+            elapsed = time.perf_counter() - started
+
+            entry = samples[label]
+            if iteration == 0:
+                entry["first_call_ms"] = round(elapsed * 1000, 2)
+            if iteration < warmup:
+                continue
+            entry["latencies"].append(elapsed * 1000)
+            entry["jira"].append(_diff_calls(jira_before, jira_server.snapshot()))
+            entry["bedrock"].append(_diff_calls(bedrock_before, bedrock_server.snapshot()))
+            if error:
+                entry["errors"] += 1
+                entry["error"] = entry["error"] or error[:300]
+
+    peaks = await _measure_memory(client, cases, settle)
+
+    report = {}
+    for label, entry in samples.items():
+        latencies = entry["latencies"]
+        report[label] = {
+            "tool": entry["tool"],
+            "runs": len(latencies),
+            "errors": entry["errors"],
+            "first_error": entry["error"],
+            "first_call_ms": entry.get("first_call_ms"),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "mean": round(sum(latencies) / len(latencies), 2),
+                "max": round(max(latencies), 2),
+            } if latencies else None,
+            "jira_calls_per_run": round(sum(entry["jira"]) / len(latencies), 2) if latencies else None,
+            "bedrock_calls_per_run": round(sum(entry["bedrock"]) / len(latencies), 2) if latencies else None,
+            "peak_memory_kb": round(peaks[label] / 1024, 1),
+        }
+    return report
+
+
+def run_scenario(scenario: str, args) -> dict:
+    """
+    Child-process entry point: starts the fakes, imports main.py against them and measures every tool.
+    """
+    from bench.fake_bedrock import FakeBedrockServer
+    from bench.fake_jira import FakeJiraServer, JiraDataset
+    from bench.fakes import use_fakes
+
+    dataset = JiraDataset(**SCENARIOS[scenario])
+    jira_server = FakeJiraServer(
+        dataset,
+        latency_ms=args.jira_latency_ms,
+        jitter_ms=args.jira_jitter_ms,
+        throttle_rate=args.jira_throttle_rate,
+        retry_after=args.jira_retry_after,
+    ).start()
+    bedrock_server = FakeBedrockServer(
+        latency_ms=args.bedrock_latency_ms,
+        token_interval_ms=args.bedrock_token_interval_ms,
+        output_tokens=args.bedrock_output_tokens,
+        throttle_rate=args.bedrock_throttle_rate,
+    ).start()
+
+    use_fakes(jira_server, bedrock_server)
+
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    import main
+    from fastmcp import Client
+    import_ms = (time.perf_counter() - started) * 1000
+
+    async def measure():
+        async with Client(main.mcp) as client:
+            available = {tool.name for tool in await client.list_tools()}
+            cases = [case for case in tool_cases(scenario, dataset) if case[1] in available]
+            covered = {tool for _, tool, _ in cases}
+            # Long enough that a background thread between two upstream requests is not mistaken for idle
+            quiet_seconds = max(0.05, 3 * (args.jira_latency_ms + args.jira_jitter_ms) / 1000, 2 * args.bedrock_latency_ms / 1000)
+            report = await _measure(client, cases, args.iterations, args.warmup, jira_server, bedrock_server, quiet_seconds)
+            return report, sorted(available - covered)
+
+    report, uncovered = asyncio.run(measure())
+    return {
+        "dataset": SCENARIOS[scenario],
+        "import_ms": round(import_ms, 2),
+        "tools": report,
+        "not_measured": {tool: SKIPPED_TOOLS.get(tool, "no benchmark case") for tool in uncovered},
+        "upstream_totals": {"jira": jira_server.snapshot(), "bedrock": bedrock_server.snapshot()},
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the Jira MCP tools.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--iterations", type=int, default=10, help="Measured runs per tool")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per tool before measuring")
+    parser.add_argument("--jira-latency-ms", type=float, default=20)
+    parser.add_argument("--jira-jitter-ms", type=float, default=10)
+    parser.add_argument("--jira-throttle-rate", type=float, default=0.0, help="Fraction of Jira requests answered with 429")
+    parser.add_argument("--jira-retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--bedrock-latency-ms", type=float, default=50)
+    parser.add_argument("--bedrock-token-interval-ms", type=float, default=2)
+    parser.add_argument("--bedrock-output-tokens", type=int, default=60)
+    parser.add_argument("--bedrock-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+
+    if args.child:
+        # Written to a file, not stdout, so stray prints from imported modules cannot corrupt it
+        with open(args.output, "w") as f:
+            json.dump(run_scenario(args.child, args), f)
+        return
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("child", "output", "scenario")}
+    forwarded = [f"--{name.replace('_', '-')}={value}" for name, value in settings.items()]
+
+    scenarios = {}
+    for scenario in args.scenario or list(SCENARIOS):
+        print(f"[bench] {scenario} ...", file=sys.stderr)
+        with tempfile.NamedTemporaryFile(suffix=".json") as child_output:
+            completed = subprocess.run(
+                [sys.executable, "-m", "bench.run", "--child", scenario, "--output", child_output.name, *forwarded],
+                cwd=ROOT, capture_output=True, text=True,
+            )
+            if completed.returncode != 0:
+                scenarios[scenario] = {"failed": True, "stderr": completed.stderr[-4000:]}
+                continue
+            scenarios[scenario] = json.load(child_output)
+
+    report = {
+        "commit": _git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "settings": settings,
+        "scenarios": scenarios,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,230 @@
-from dataclasses import dataclass
+import base64
+from dataclasses import dataclass, field
+import hashlib
 import json
 import logging
+import threading
 import time
 from typing import List, Optional
-from difflib import get_close_matches
 from fastapi import HTTPException
 from datetime import datetime, timedelta
 import re
-from utils.bedrock_wrapper import call_claude  # Your Claude wrapper
-from jira import JIRA  # Atlassian Python client
+from utils.bedrock_wrapper import call_claude, fetch_embeddings  # Your Claude wrapper
 import os
 from dotenv import load_dotenv
 
-from utils.parse_time_range import parse_time_range_to_bounds
+from utils.jira_client import call_jira, call_jira_bulk, map_bounded, run_blocking  # Shared, concurrency-limited Jira client
+from utils.issue_mirror import SORTABLE_COLUMNS as MIRROR_SORTABLE_COLUMNS, IssueMirror
+from utils.paths import CACHE_DIR
+from utils.project_index import ProjectIndex
+from utils.tracing import cache_event
+from utils.ttl_cache import TTLCache
+from utils.vector_index import VectorIndex
 
 load_dotenv(override=True)
 
 
-JIRA_URL = os.getenv("JIRA_BASE_URL")
-JIRA_USER = os.getenv("JIRA_EMAIL")
-JIRA_TOKEN = os.getenv("JIRA_API_TOKEN")
+class MetadataCache:
+    """
+    Thread-safe in-process cache for slow-changing Jira metadata
+    (projects, priorities, statuses, issue types).
+
+    Every entity has its own TTL. Once an entry is older than
+    `refresh_ahead * ttl` it is still served, but a background thread reloads it
+    so callers rarely wait on the round trip. Expired entries are reloaded inline.
+
+    Each entity also carries a version number that is bumped whenever a reload
+    returns different data; derived caches can key on it or subscribe to changes.
+    """
 
-jira = JIRA(server=JIRA_URL, basic_auth=(JIRA_USER, JIRA_TOKEN))
+    def __init__(self, loaders: dict, ttls: dict, refresh_ahead: float = 0.8):
+        self._loaders = loaders
+        self._ttls = ttls
+        self._refresh_ahead = refresh_ahead
+        self._entries = {}  # name -> (value, loaded_at)
+        self._invalidated = {}  # name -> value dropped by invalidate(), so the next load can still detect a change
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in loaders}
+        self._refreshing = set()
+        self._hits = {name: 0 for name in loaders}
+        self._misses = {name: 0 for name in loaders}
+        self._refresh_errors = {name: 0 for name in loaders}
+        self._versions = {name: 0 for name in loaders}
+        self._listeners = []
+
+    def get(self, name: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and now - entry[1] < self._ttls[name]:
+                self._hits[name] += 1
+                cache_event("metadata", hit=True, entity=name)
+                if now - entry[1] >= self._ttls[name] * self._refresh_ahead and name not in self._refreshing:
+                    self._refreshing.add(name)
+                    threading.Thread(target=self._background_refresh, args=(name,), daemon=True).start()
+                return entry[0]
+            self._misses[name] += 1
+        cache_event("metadata", hit=False, entity=name)
+
+        with self._load_locks[name]:
+            # Another caller may have reloaded the entry while we were waiting
+            entry = self._entries.get(name)
+            if entry is not None and time.monotonic() - entry[1] < self._ttls[name]:
+                return entry[0]
+            return self._load(name)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Drops one cached entity, or all of them when no name is given. The dropped value is
+        remembered, so the reload still bumps the version and notifies listeners if the data changed.
+        """
+        with self._lock:
+            for entity in ([name] if name is not None else list(self._entries)):
+                entry = self._entries.pop(entity, None)
+                if entry is not None:
+                    self._invalidated[entity] = entry[0]
+
+    def version(self, name: str) -> int:
+        return self._versions[name]
+
+    def subscribe(self, listener) -> None:
+        """
+        Registers listener(name) to be called after an entity's data changes.
+        """
+        self._listeners.append(listener)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            entities = {
+                name: {
+                    "hits": self._hits[name],
+                    "misses": self._misses[name],
+                    "refresh_errors": self._refresh_errors[name],
+                    "ttl_seconds": self._ttls[name],
+                    "age_seconds": round(now - self._entries[name][1], 1) if name in self._entries else None,
+                    "version": self._versions[name],
+                }
+                for name in self._loaders
+            }
+        return {
+            "hits": sum(e["hits"] for e in entities.values()),
+            "misses": sum(e["misses"] for e in entities.values()),
+            "entities": entities,
+        }
+
+    def _load(self, name: str):
+        value = self._loaders[name]()
+        with self._lock:
+            previous = self._entries.get(name)
+            previous_value = previous[0] if previous is not None else self._invalidated.pop(name, None)
+            changed = previous_value is not None and previous_value != value
+            if changed:
+                self._versions[name] += 1
+            self._entries[name] = (value, time.monotonic())
+
+        if changed:
+            for listener in self._listeners:
+                try:
+                    listener(name)
+                except Exception as e:
+                    logging.warning(f"[Metadata Cache] Change listener failed for '{name}': {e}")
+        return value
+
+    def _background_refresh(self, name: str) -> None:
+        try:
+            with self._load_locks[name]:
+                self._load(name)
+        except Exception as e:
+            with self._lock:
+                self._refresh_errors[name] += 1
+            logging.warning(f"[Metadata Cache] Background refresh of '{name}' failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+
+metadata_cache = MetadataCache(
+    loaders={
+        "projects": lambda: [
+            {
+                "key": p.key,
+                "name": p.name,
+                "description": p.raw.get("description") or "",
+                "category": (p.raw.get("projectCategory") or {}).get("name"),
+            }
+            for p in call_jira("projects", expand="description")
+        ],
+        "priorities": lambda: [p.name for p in call_jira("priorities")],
+        "statuses": lambda: [s.name for s in call_jira("statuses")],
+        "issue_types": lambda: sorted({it.name for it in call_jira("issue_types")}),
+    },
+    ttls={
+        "projects": int(os.getenv("JIRA_PROJECTS_TTL", "900")),
+        "priorities": int(os.getenv("JIRA_PRIORITIES_TTL", "3600")),
+        "statuses": int(os.getenv("JIRA_STATUSES_TTL", "3600")),
+        "issue_types": int(os.getenv("JIRA_ISSUE_TYPES_TTL", "3600")),
+    },
+    refresh_ahead=float(os.getenv("JIRA_METADATA_REFRESH_AHEAD", "0.8")),
+)
+
+
+# Page size for comment threads longer than what Jira embeds in the issue payload
+COMMENT_PAGE_SIZE = int(os.getenv("JIRA_COMMENT_PAGE_SIZE", "100"))
+
+
+def _fetch_comment_pages(issue_key: str, start_at: int = 0, total: Optional[int] = None) -> list[dict]:
+    """
+    Fetches comments from `start_at` onwards, page by page, as raw JSON dicts. The client's
+    comments() does not return the thread's total, so without `total` paging stops at an empty page.
+    """
+    comments = []
+    while total is None or start_at < total:
+        batch = call_jira("comments", issue_key, start_at=start_at, max_results=COMMENT_PAGE_SIZE)
+        if not batch:
+            break
+        comments.extend(c.raw for c in batch)
+        start_at += len(batch)
+    return comments
 
 
-def get_clean_comments_from_issue(jira, issue) -> list[dict]:
+def get_clean_comments_from_issue(issue) -> list[dict]:
     """
     Returns raw comments from a Jira issue, including author and created timestamp.
     No filtering or cleaning is applied to avoid losing useful content.
+
+    Comments embedded in the issue payload (fetched with the 'comment' field) are
+    used as-is; Jira is only asked again for the part of a thread beyond the embedded page.
     """
     try:
-        comments = jira.comments(issue)
-        return [
-            {
-                "author": c.author.displayName,
-                "created": c.created,
-                "text": c.body  # raw, full comment content
-            }
-            for c in comments
-        ]
+        comment_field = issue.raw.get("fields", {}).get("comment")
+
+        if comment_field is None:
+            return _clean_comments(_fetch_comment_pages(issue.key))
+
+        embedded = comment_field.get("comments", [])
+        total = comment_field.get("total", len(embedded))
+        if total > len(embedded):
+            comments = embedded + _fetch_comment_pages(issue.key, start_at=len(embedded), total=total)
+        else:
+            comments = embedded
+        return _clean_comments(comments)
     except Exception as e:
         return [{"error": str(e)}]
 
 
-def extract_issue_fields(issue, include_comments=False, jira_client=None):
+def _clean_comments(comments: list[dict]) -> list[dict]:
+    return [
+        {
+            "author": (c.get("author") or {}).get("displayName"),
+            "created": c.get("created"),
+            "text": c.get("body")  # raw, full comment content
+        }
+        for c in comments
+    ]
+
+
+def extract_issue_fields(issue, include_comments=False):
     data = {
         "key": issue.key,
         "summary": issue.fields.summary,
@@ -56,36 +237,713 @@ def extract_issue_fields(issue, include_comments=False, jira_client=None):
         "task_type": issue.fields.issuetype.name if issue.fields.issuetype else None,
     }
 
-    if include_comments and jira_client is not None:
-        from helpers import get_clean_comments_from_issue
-        data["comments"] = get_clean_comments_from_issue(jira_client, issue)
+    if include_comments:
+        data["comments"] = get_clean_comments_from_issue(issue)
 
     return data
 
 
+# Fields read by extract_issue_fields; passed as `fields=` so Jira skips everything else
+ISSUE_FIELDS = ["summary", "status", "priority", "assignee", "reporter", "created", "updated", "issuetype"]
+
+# Fields read by the search_issues and execute_jql_query tools
+SEARCH_FIELDS = ["summary"]
+JQL_QUERY_FIELDS = ["summary", "issuetype", "status", "assignee", "created", "updated", "project", "resolution", "priority"]
+
+
+def with_extra_fields(base: List[str], extra: Optional[List[str]] = None) -> str:
+    """
+    Builds the comma-separated `fields=` value: the fields a tool needs plus any caller extras.
+    """
+    extra = [f.strip() for f in extra or [] if f.strip()]
+    return ",".join(dict.fromkeys(base + extra))
+
+
+def extract_extra_fields(issue, extra: Optional[List[str]]) -> dict:
+    """
+    Returns the raw JSON values of caller-requested extra fields (e.g. custom fields).
+    """
+    raw_fields = issue.raw.get("fields", {})
+    return {name: raw_fields.get(name) for name in (f.strip() for f in extra or []) if name}
+
+# Keys per `key in (...)` search; Jira caps a single search page at 100 issues
+BATCH_FETCH_CHUNK_SIZE = int(os.getenv("JIRA_BATCH_CHUNK_SIZE", "50"))
+
+ISSUE_KEY_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$")
+
+
+@dataclass
+class IssueBatch:
+    issues: list  # jira Issue objects in input order
+    missing: List[str]  # keys Jira did not return (deleted, no permission, malformed)
+    errors: dict  # key -> error message for keys whose chunk request failed
+    aliases: dict = field(default_factory=dict)  # requested key -> current key of moved/renamed issues
+
+
+def _chunk_issue_keys(keys: List[str], chunk_size: int) -> tuple[List[str], List[List[str]], List[str]]:
+    """
+    Normalizes and de-duplicates keys (keeping first-seen order) and splits them into chunks.
+    Returns (ordered_keys, chunks, malformed_keys).
+    """
+    ordered, malformed, seen = [], [], set()
+    for key in keys:
+        key = key.strip().upper()
+        if key in seen:
+            continue
+        seen.add(key)
+        if ISSUE_KEY_PATTERN.match(key):
+            ordered.append(key)
+        else:
+            malformed.append(key)
+
+    chunk_size = max(1, min(chunk_size, 100))
+    chunks = [ordered[i:i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+    return ordered, chunks, malformed
+
+
+def _search_issue_chunk(chunk: List[str], fields: List[str]) -> dict:
+    """
+    Searches one chunk of keys and returns requested key -> issue. Jira answers `key in (...)`
+    for a moved or renamed issue with the issue under its current key; when that happens, the
+    requested keys left unmatched are looked up one by one (GET /issue follows the old key).
+    """
+    # validate_query=False turns unknown keys into warnings instead of failing the whole query
+    issues = call_jira(
+        "search_issues",
+        f"key in ({', '.join(chunk)})",
+        maxResults=len(chunk),
+        fields=",".join(fields),
+        validate_query=False,
+    )
+    by_key = {issue.key: issue for issue in issues}
+    unmatched = [key for key in chunk if key not in by_key]
+    if unmatched and any(key not in chunk for key in by_key):
+        for key in unmatched:
+            try:
+                by_key[key] = call_jira("issue", key, fields=",".join(fields))
+            except Exception:
+                pass  # deleted or not visible; reported as missing
+    return {key: by_key[key] for key in chunk if key in by_key}
+
+
+def _assemble_issue_batch(ordered: List[str], chunks: List[List[str]], results: list, malformed: List[str]) -> IssueBatch:
+    by_key, errors = {}, {}
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            errors.update({key: str(result) for key in chunk})
+            continue
+        by_key.update(result)
+
+    issues = list({by_key[key].key: by_key[key] for key in ordered if key in by_key}.values())
+    missing = [key for key in ordered if key not in by_key and key not in errors] + malformed
+    aliases = {key: issue.key for key, issue in by_key.items() if issue.key != key}
+    return IssueBatch(issues=issues, missing=missing, errors=errors, aliases=aliases)
+
+
+async def afetch_issues_by_keys(
+    keys: List[str],
+    fields: Optional[List[str]] = None,
+    chunk_size: int = BATCH_FETCH_CHUNK_SIZE,
+    max_workers: int = 4,
+) -> IssueBatch:
+    """
+    Fetches many issues with a few chunked `key in (...)` searches instead of one request per key,
+    running up to `max_workers` chunk searches concurrently.
+
+    Parameters:
+    - keys: Issue keys (e.g. ['DEV-1', 'DEV-2']); duplicates are collapsed.
+    - fields: Fields to request (defaults to ISSUE_FIELDS). 'comment' is always included.
+    - chunk_size: Keys per search request (max 100).
+    - max_workers: Chunk searches in flight at once.
+
+    Returns:
+    - IssueBatch with issues in input order, missing keys, per-key errors of failed chunks, and
+      the current key of every requested key that was moved or renamed.
+    """
+    fields = list(dict.fromkeys((fields or ISSUE_FIELDS) + ["comment"]))
+    ordered, chunks, malformed = _chunk_issue_keys(keys, chunk_size)
+
+    results = await map_bounded(
+        lambda chunk: run_blocking(_search_issue_chunk, chunk, fields),
+        chunks,
+        max_workers,
+    )
+    return _assemble_issue_batch(ordered, chunks, results, malformed)
+
+
+# Page size and per-call window for execute_jql_query
+JQL_PAGE_SIZE = int(os.getenv("JQL_PAGE_SIZE", "50"))
+JQL_MAX_WINDOW = int(os.getenv("JQL_MAX_WINDOW", "5000"))
+# Upper bound on concurrently fetched pages in execute_jql_query's parallel mode
+JQL_MAX_PREFETCH_PARALLELISM = int(os.getenv("JQL_MAX_PREFETCH_PARALLELISM", "8"))
+
+
+def extract_compact_issue(issue, extra_fields: Optional[List[str]] = None) -> dict:
+    """
+    Compact per-issue format returned by execute_jql_query (see JQL_QUERY_FIELDS).
+    """
+    fields = issue.fields
+    item = {
+        "key": issue.key,
+        "summary": fields.summary,
+        "issue_type": getattr(fields.issuetype, "name", None),
+        "status": getattr(fields.status, "name", None),
+        "assignee": getattr(fields.assignee, "displayName", None) if fields.assignee else None,
+        "created": fields.created,
+        "updated": fields.updated,
+        "project": getattr(fields.project, "key", None),
+        "resolution": getattr(fields.resolution, "name", None) if fields.resolution else None,
+        "priority": getattr(fields.priority, "name", None) if fields.priority else None,
+    }
+    if extra_fields:
+        item["extra_fields"] = extract_extra_fields(issue, extra_fields)
+    return item
+
+
+def iter_jql_pages(jql: str, fields: str, start_at: int = 0, limit: Optional[int] = None, page_size: int = JQL_PAGE_SIZE):
+    """
+    Lazily yields pages (jira ResultList, with `.total`) of a JQL search starting at `start_at`.
+    Stops after `limit` issues, when Jira runs out of results, or when the consumer stops iterating,
+    so only one page is held at a time.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        max_results = page_size if remaining is None else min(page_size, remaining)
+        page = call_jira_bulk("search_issues", jql, startAt=start_at, maxResults=max_results, fields=fields)
+        if not page:
+            return
+        yield page
+
+        start_at += len(page)
+        if remaining is not None:
+            remaining -= len(page)
+        if len(page) < max_results or start_at >= page.total:
+            return  # no more pages
+
+
+def iter_jql_issues(jql: str, fields: str, start_at: int = 0, limit: Optional[int] = None):
+    """
+    Lazily yields individual issues of a JQL search; see iter_jql_pages.
+    """
+    for page in iter_jql_pages(jql, fields, start_at=start_at, limit=limit):
+        yield from page
+
+
+def _jql_fingerprint(jql: str) -> str:
+    return hashlib.sha1(jql.strip().encode()).hexdigest()[:16]
+
+
+def encode_jql_cursor(jql: str, start_at: int) -> str:
+    """
+    Builds the opaque continuation token returned by execute_jql_query.
+    """
+    payload = json.dumps({"q": _jql_fingerprint(jql), "s": start_at}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_jql_cursor(cursor: str, jql: str) -> int:
+    """
+    Returns the start offset stored in a cursor, rejecting cursors issued for a different query.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        start_at = int(payload["s"])
+        fingerprint = payload["q"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed cursor.")
+
+    if fingerprint != _jql_fingerprint(jql) or start_at < 0:
+        raise HTTPException(status_code=400, detail="Cursor does not belong to this JQL query.")
+    return start_at
+
+
+def collect_jql_window(jql: str, start_at: int, limit: int, extra_fields: Optional[List[str]] = None) -> dict:
+    """
+    Runs one execute_jql_query window: streams pages from `start_at`, converts each issue to the
+    compact format and returns at most `limit` issues plus the cursor for the next window.
+    """
+    fields = with_extra_fields(JQL_QUERY_FIELDS, extra_fields)
+    issues, total, position = [], None, start_at
+
+    for page in iter_jql_pages(jql, fields, start_at=start_at, limit=limit):
+        total = page.total
+        issues.extend(extract_compact_issue(issue, extra_fields) for issue in page)
+        position += len(page)
+
+    has_more = total is not None and position < total
+    return {
+        "issues": issues,
+        "total": total,
+        "next_cursor": encode_jql_cursor(jql, position) if has_more else None,
+    }
+
+
+async def acollect_jql_window_concurrent(
+    jql: str,
+    start_at: int,
+    limit: int,
+    extra_fields: Optional[List[str]] = None,
+    parallelism: int = 4,
+) -> dict:
+    """
+    Same result as collect_jql_window, but once the first page reports `total` the remaining
+    page offsets are fetched concurrently (at most `parallelism` at a time) and reassembled in order.
+    """
+    fields = with_extra_fields(JQL_QUERY_FIELDS, extra_fields)
+    first = await run_blocking(
+        call_jira_bulk, "search_issues", jql, startAt=start_at, maxResults=min(JQL_PAGE_SIZE, limit), fields=fields
+    )
+    total = first.total
+    end = min(start_at + limit, total)
+
+    # Jira may cap maxResults below what we asked for; use the size it actually served
+    page_size = len(first) or JQL_PAGE_SIZE
+    offsets = list(range(start_at + len(first), end, page_size)) if first else []
+
+    async def fetch_page(offset: int):
+        return await run_blocking(
+            call_jira_bulk, "search_issues", jql, startAt=offset, maxResults=min(page_size, end - offset), fields=fields
+        )
+
+    pages = [first] + await map_bounded(fetch_page, offsets, parallelism)
+    for page in pages:
+        if isinstance(page, Exception):
+            raise page
+
+    issues, position = [], start_at
+    for offset, page in zip([start_at] + offsets, pages):
+        if offset > position:
+            # A page came back short (results shifted or server cap); fill the gap sequentially
+            gap = await run_blocking(lambda: list(iter_jql_issues(jql, fields, start_at=position, limit=offset - position)))
+            issues.extend(extract_compact_issue(issue, extra_fields) for issue in gap)
+        issues.extend(extract_compact_issue(issue, extra_fields) for issue in page)
+        position = offset + len(page)
+
+    has_more = position < total
+    return {
+        "issues": issues,
+        "total": total,
+        "next_cursor": encode_jql_cursor(jql, position) if has_more else None,
+    }
+
+
+_project_index = None
+_project_index_lock = threading.Lock()
+
+
+def get_project_index() -> ProjectIndex:
+    """
+    Returns the ProjectIndex for the current project list, rebuilding it once per metadata refresh.
+    """
+    global _project_index
+
+    projects = metadata_cache.get("projects")
+    with _project_index_lock:
+        if _project_index is None or _project_index.projects is not projects:
+            _project_index = ProjectIndex(projects)
+        return _project_index
+
+
+# Opt-in: adds the projects closest in embedding space to the candidates Claude picks from.
+# Similarity alone never resolves a project (names sharing a domain word score high too), and
+# enabling it embeds every project in the background on the first lookup.
+PROJECT_SEMANTIC_RESOLVER = os.getenv("PROJECT_SEMANTIC_RESOLVER", "false").lower() == "true"
+
+project_vectors = VectorIndex("project_vectors")
+_project_vectors_source = None  # project list the vectors were last synced against
+_project_vectors_lock = threading.Lock()
+
+
+def _project_embedding_text(project: dict) -> str:
+    parts = [f"{project['name']} ({project['key']})"]
+    if project.get("category"):
+        parts.append(f"Category: {project['category']}")
+    if project.get("description"):
+        parts.append(project["description"][:1000])
+    return "\n".join(parts)
+
+
+def _sync_project_vectors(projects: list[dict]) -> None:
+    global _project_vectors_source
+    try:
+        stats = project_vectors.update(
+            {p["key"]: _project_embedding_text(p) for p in projects},
+            embed_many=fetch_embeddings,
+            replace_all=True,
+        )
+        logging.info(f"[Project Vectors] Synced: {stats}")
+    except Exception as e:
+        logging.warning(f"[Project Vectors] Sync failed: {e}")
+        with _project_vectors_lock:
+            _project_vectors_source = None  # retry on next lookup
+
+
+def _schedule_project_vector_sync(projects: list[dict]) -> None:
+    """
+    Re-syncs project vectors in the background whenever the project list was refreshed.
+    Only projects whose name/description changed are re-embedded.
+    """
+    global _project_vectors_source
+    with _project_vectors_lock:
+        if _project_vectors_source is projects:
+            return
+        _project_vectors_source = projects
+    threading.Thread(target=_sync_project_vectors, args=(projects,), daemon=True).start()
+
+
+def _semantic_project_matches(human_input: str, k: int = 5) -> list[tuple[dict, float]]:
+    """
+    Returns the top-k projects by cosine similarity between the input and project embeddings.
+    Empty while the index is still being built.
+    """
+    projects = metadata_cache.get("projects")
+    _schedule_project_vector_sync(projects)
+    if not len(project_vectors):
+        return []
+
+    by_key = {p["key"]: p for p in projects}
+    matches = project_vectors.query(fetch_embeddings([human_input])[0], k=k)
+    return [(by_key[key], score) for key, score in matches if key in by_key]
+
+
+# Semantic issue search over a persisted embedding index of issue summaries/descriptions
+ISSUE_VECTOR_FIELDS = ["summary", "description", "updated"]
+ISSUE_VECTOR_TEXT_CHARS = int(os.getenv("ISSUE_VECTOR_TEXT_CHARS", "2000"))
+# Issues fetched per project per sync; the first sync indexes the most recently updated ones
+ISSUE_VECTOR_SYNC_LIMIT = int(os.getenv("ISSUE_VECTOR_SYNC_LIMIT", "5000"))
+# Minimum seconds between delta syncs of the same project
+ISSUE_VECTOR_SYNC_INTERVAL = int(os.getenv("ISSUE_VECTOR_SYNC_INTERVAL", "300"))
+# Full re-reads drop issues that were deleted or moved to another project, which delta syncs cannot see
+ISSUE_VECTOR_FULL_SYNC_INTERVAL = int(os.getenv("ISSUE_VECTOR_FULL_SYNC_INTERVAL", "86400"))
+# Delta syncs re-read this much history: JQL dates use the Jira user's timezone while
+# `updated` values carry the server's, and re-reading unchanged issues is cheap
+ISSUE_SYNC_OVERLAP = timedelta(hours=int(os.getenv("ISSUE_SYNC_OVERLAP_HOURS", "24")))
+
+# Issues embedded and persisted per step, so a first sync makes results searchable as it goes
+ISSUE_VECTOR_BATCH_SIZE = int(os.getenv("ISSUE_VECTOR_BATCH_SIZE", "500"))
+
+issue_vectors = VectorIndex("issue_vectors")
+_issue_vector_locks = {}  # project key -> lock held while that project syncs
+_issue_vector_builds = set()  # projects whose full sync is running in the background
+_issue_vectors_state_lock = threading.Lock()
+
+
+def _delta_sync_jql(project_key: str, last_sync: str) -> str:
+    """
+    JQL for a project sync: everything (newest first) without a watermark, otherwise the
+    issues updated since `last_sync` minus ISSUE_SYNC_OVERLAP, oldest first.
+    """
+    jql = f'project = "{project_key}"'
+    if not last_sync:
+        return jql + " ORDER BY updated DESC"
+    since = datetime.strptime(last_sync, "%Y-%m-%d %H:%M") - ISSUE_SYNC_OVERLAP
+    return jql + f' AND updated >= "{since:%Y-%m-%d %H:%M}" ORDER BY updated ASC'
+
+
+def _updated_watermark(issue) -> str:
+    # '2025-01-02T10:11:12.000+0100' -> '2025-01-02 10:11' (JQL minute precision)
+    return issue.fields.updated[:16].replace("T", " ")
+
+
+def _issue_embedding_text(issue) -> str:
+    description = issue.fields.description or ""
+    return f"{issue.key}: {issue.fields.summary or ''}\n{description}"[:ISSUE_VECTOR_TEXT_CHARS]
+
+
+def _issue_vector_lock(project_key: str) -> threading.Lock:
+    with _issue_vectors_state_lock:
+        return _issue_vector_locks.setdefault(project_key, threading.Lock())
+
+
+def _issue_vector_state(project_key: str) -> Optional[dict]:
+    return issue_vectors.meta.get("projects", {}).get(project_key)
+
+
+def _full_issue_sync_due(state: Optional[dict]) -> bool:
+    return not state or time.time() - state.get("full_synced_at", 0) >= ISSUE_VECTOR_FULL_SYNC_INTERVAL
+
+
+def _sync_issue_vectors_locked(project_key: str, force: bool) -> dict:
+    state = _issue_vector_state(project_key) or {}
+    full = _full_issue_sync_due(state)
+    if not force and not full and time.time() - state.get("synced_at", 0) < ISSUE_VECTOR_SYNC_INTERVAL:
+        return {"skipped": True}
+
+    started = time.time()
+    jql = _delta_sync_jql(project_key, "" if full else state.get("last_sync", ""))
+    stats = {"embedded": 0, "removed": 0, "unchanged": 0, "full": full}
+    items, seen, watermark = {}, set(), state.get("last_sync", "")
+
+    def flush():
+        for name, count in issue_vectors.update(items, embed_many=fetch_embeddings).items():
+            stats[name] += count
+        items.clear()
+
+    for issue in iter_jql_issues(jql, ",".join(ISSUE_VECTOR_FIELDS), limit=ISSUE_VECTOR_SYNC_LIMIT):
+        items[issue.key] = _issue_embedding_text(issue)
+        seen.add(issue.key)
+        watermark = max(watermark, _updated_watermark(issue))
+        if len(items) >= ISSUE_VECTOR_BATCH_SIZE:
+            flush()
+    flush()
+
+    if full:
+        # Indexed keys of this project that Jira no longer returns: deleted, moved away, or
+        # fallen out of the ISSUE_VECTOR_SYNC_LIMIT most recently updated issues
+        prefix = f"{project_key}-"
+        stale = [key for key in issue_vectors.keys if key.startswith(prefix) and key not in seen]
+        if stale:
+            stats["removed"] += issue_vectors.update({}, embed_many=fetch_embeddings, remove=stale)["removed"]
+
+    sync_state = {
+        "last_sync": watermark,
+        "synced_at": time.time(),
+        "full_synced_at": started if full else state.get("full_synced_at", 0),
+    }
+    # Copy-on-write: other projects' syncs may be persisting `meta` concurrently
+    with _issue_vectors_state_lock:
+        projects = {**issue_vectors.meta.get("projects", {}), project_key: sync_state}
+        issue_vectors.meta = {**issue_vectors.meta, "projects": projects}
+        issue_vectors.save_meta()
+
+    logging.info(f"[Issue Vectors] Synced {project_key}: {stats}")
+    return stats
+
+
+def sync_issue_vectors(project_key: str, force: bool = False) -> dict:
+    """
+    Brings the issue vectors of one project up to date.
+
+    The first sync, and one every ISSUE_VECTOR_FULL_SYNC_INTERVAL seconds, reads the
+    ISSUE_VECTOR_SYNC_LIMIT most recently updated issues and drops the project's indexed keys
+    it did not see; other syncs only query `updated >= last_sync`. Either way only issues
+    whose text changed are re-embedded. The per-project watermark is kept in the index's
+    `meta`. Projects sync independently; only a second sync of the same project waits.
+
+    Returns VectorIndex.update counts and `full`, or `skipped` when the last sync is recent enough.
+    """
+    with _issue_vector_lock(project_key):
+        return _sync_issue_vectors_locked(project_key, force)
+
+
+def _build_issue_vectors(project_key: str) -> None:
+    try:
+        sync_issue_vectors(project_key, force=True)
+    except Exception as e:
+        logging.warning(f"[Issue Vectors] Full sync of {project_key} failed: {e}")
+    finally:
+        with _issue_vectors_state_lock:
+            _issue_vector_builds.discard(project_key)
+
+
+def refresh_issue_vectors(project_key: str) -> dict:
+    """
+    Sync step for a search request, which must not wait for long-running work:
+    - full sync due: starts it (potentially large) in the background and returns
+      {"status": "building"} for a project never synced, whose issues become searchable
+      batch by batch, or {"status": "syncing"} for one that keeps serving its current index.
+    - already syncing (in the background or for another request): returns {"status": "syncing"}.
+    - otherwise: runs the usual delta sync inline and returns its counts.
+    """
+    state = _issue_vector_state(project_key)
+    if _full_issue_sync_due(state):
+        with _issue_vectors_state_lock:
+            if project_key not in _issue_vector_builds:
+                _issue_vector_builds.add(project_key)
+                threading.Thread(
+                    target=_build_issue_vectors, args=(project_key,), name=f"issue-vectors-{project_key}", daemon=True
+                ).start()
+        return {"status": "building" if state is None else "syncing"}
+
+    lock = _issue_vector_lock(project_key)
+    if not lock.acquire(blocking=False):
+        return {"status": "syncing"}
+    try:
+        return _sync_issue_vectors_locked(project_key, force=False)
+    finally:
+        lock.release()
+
+
+def semantic_issue_matches(query: str, project_keys: List[str], k: int = 10) -> list[tuple[str, float]]:
+    """
+    Returns the top-k (issue key, cosine similarity) pairs for `query` within the given projects.
+    """
+    prefixes = tuple(f"{key}-" for key in project_keys)
+    return issue_vectors.query(
+        fetch_embeddings([query])[0],
+        k=k,
+        key_filter=lambda key: key.startswith(prefixes),
+    )
+
+
+# Optional local mirror of the listed projects, used to answer structured searches without Jira
+ISSUE_MIRROR_PROJECTS = [p.strip().upper() for p in os.getenv("JIRA_MIRROR_PROJECTS", "").split(",") if p.strip()]
+ISSUE_MIRROR_PATH = os.getenv("JIRA_MIRROR_PATH", os.path.join(CACHE_DIR, "issue_mirror.sqlite3"))
+# Seconds between background delta syncs
+ISSUE_MIRROR_SYNC_INTERVAL = int(os.getenv("JIRA_MIRROR_SYNC_INTERVAL", "60"))
+# Reads are served from the mirror only while every involved project synced within this many seconds
+ISSUE_MIRROR_MAX_STALENESS = int(os.getenv("JIRA_MIRROR_MAX_STALENESS", "300"))
+# Full re-reads detect issues that were deleted or moved, which delta syncs cannot see
+ISSUE_MIRROR_FULL_SYNC_INTERVAL = int(os.getenv("JIRA_MIRROR_FULL_SYNC_INTERVAL", "86400"))
+ISSUE_MIRROR_BATCH_SIZE = 500
+
+issue_mirror = IssueMirror(ISSUE_MIRROR_PATH) if ISSUE_MIRROR_PROJECTS else None
+_issue_mirror_thread = None
+
+
+def _mirror_row(issue) -> dict:
+    fields = issue.fields
+    assignee = fields.assignee
+    return {
+        "key": issue.key,
+        "project": issue.key.rsplit("-", 1)[0],
+        "summary": fields.summary,
+        "status": fields.status.name,
+        "priority": fields.priority.name if fields.priority else None,
+        "assignee": assignee.displayName if assignee else None,
+        "assignee_id": (getattr(assignee, "name", None) or getattr(assignee, "accountId", None)) if assignee else None,
+        "reporter": fields.reporter.displayName if fields.reporter else None,
+        "issue_type": fields.issuetype.name if fields.issuetype else None,
+        "created": fields.created,
+        "updated": fields.updated,
+    }
+
+
+def sync_issue_mirror(project_key: str, full: bool = False) -> dict:
+    """
+    Brings one mirrored project up to date with an `updated >=` delta query, or re-reads
+    the whole project (dropping vanished issues) on the first run and every
+    ISSUE_MIRROR_FULL_SYNC_INTERVAL seconds.
+
+    Returns counts of upserted and removed issues.
+    """
+    started = time.time()
+    state = issue_mirror.sync_state(project_key)
+    full = full or state is None or started - state["full_synced_at"] >= ISSUE_MIRROR_FULL_SYNC_INTERVAL
+    last_sync = "" if full else state["last_sync"]
+
+    rows, seen, watermark = [], set(), last_sync
+    for issue in iter_jql_issues(_delta_sync_jql(project_key, last_sync), ",".join(ISSUE_FIELDS)):
+        rows.append(_mirror_row(issue))
+        seen.add(issue.key)
+        watermark = max(watermark, _updated_watermark(issue))
+        if len(rows) >= ISSUE_MIRROR_BATCH_SIZE:
+            issue_mirror.upsert(rows)
+            rows = []
+    issue_mirror.upsert(rows)
+
+    removed = issue_mirror.remove_missing(project_key, seen) if full else 0
+    # Data is current as of when the query started, so staleness is measured from `started`
+    issue_mirror.set_sync_state(
+        project_key, watermark, synced_at=started, full_synced_at=started if full else state["full_synced_at"]
+    )
+    return {"upserted": len(seen), "removed": removed, "full": full}
+
+
+def _issue_mirror_loop() -> None:
+    while True:
+        for project_key in ISSUE_MIRROR_PROJECTS:
+            try:
+                stats = sync_issue_mirror(project_key)
+                logging.info(f"[Issue Mirror] Synced {project_key}: {stats}")
+            except Exception as e:
+                logging.warning(f"[Issue Mirror] Sync of {project_key} failed: {e}")
+        time.sleep(ISSUE_MIRROR_SYNC_INTERVAL)
 
 
+def start_issue_mirror_sync() -> None:
+    """
+    Starts the background delta sync of JIRA_MIRROR_PROJECTS (no-op when none are configured).
+    """
+    global _issue_mirror_thread
+    if issue_mirror is None or _issue_mirror_thread is not None:
+        return
+    _issue_mirror_thread = threading.Thread(target=_issue_mirror_loop, name="issue-mirror", daemon=True)
+    _issue_mirror_thread.start()
+
+
+def issue_mirror_staleness(project_keys: List[str]) -> Optional[float]:
+    """
+    Seconds since the least recently synced of `project_keys` was synced, or None when
+    any of them is not mirrored (or never synced).
+    """
+    if issue_mirror is None or not project_keys:
+        return None
+    synced = []
+    for key in project_keys:
+        state = issue_mirror.sync_state(key.upper()) if key.upper() in ISSUE_MIRROR_PROJECTS else None
+        if state is None:
+            return None
+        synced.append(state["synced_at"])
+    return max(0.0, time.time() - min(synced))
+
+
+def search_issue_mirror(sort_by: str, order: str, limit: int, **filters) -> list[dict]:
+    """
+    Runs a search_advanced_issues query against the mirror, returning issues in the
+    extract_issue_fields format.
+    """
+    rows = issue_mirror.search(sort_by=sort_by, order=order, limit=limit, **filters)
+    return [
+        {
+            "key": row["key"],
+            "summary": row["summary"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "assignee": row["assignee"],
+            "reporter": row["reporter"],
+            "created": row["created"],
+            "updated": row["updated"],
+            "task_type": row["issue_type"],
+        }
+        for row in rows
+    ]
+
 
 def _resolve_project_keys(human_input: str) -> List[str]:
     """
-    Resolve Jira project keys from human-friendly input using Claude.
+    Resolve Jira project keys from human-friendly input.
     Returns a list of project keys.
     """
+    return _match_project_keys(human_input)[0]
+
+
+def _match_project_keys(human_input: str) -> tuple[List[str], str]:
+    """
+    Resolves project keys like _resolve_project_keys and also reports how they were found.
+
+    Exact keys/names and unambiguous index matches are answered locally; everything
+    else is sent to Claude with the best index candidates, preceded by the closest
+    semantic (embedding) matches when PROJECT_SEMANTIC_RESOLVER is on.
+    Returns (keys, path), path being "exact_key" | "exact_name" | "index" | "llm".
+    """
 
     try:
-        projects = jira.projects()
-        candidates = [{"key": p.key, "name": p.name} for p in projects]
+        index = get_project_index()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch Jira projects: {e}")
 
-    # Fuzzy matching on project names
-    name_pool = [proj["name"] for proj in candidates]
-    fuzzy_names = get_close_matches(human_input, name_pool, n=10, cutoff=0.4)
+    exact = index.exact(human_input)
+    if exact:
+        path, keys = exact
+        return keys, path
+
+    ranked = index.rank(human_input, limit=10)
+    confident = index.confident_match(ranked)
+    if confident:
+        return [confident["key"]], "index"
+
+    semantic = []
+    if PROJECT_SEMANTIC_RESOLVER:
+        try:
+            semantic = _semantic_project_matches(human_input)
+        except Exception as e:
+            logging.warning(f"[Project Vectors] Semantic lookup failed, falling back to LLM: {e}")
 
-    if not fuzzy_names:
+    filtered = list({proj["key"]: proj for proj, _ in semantic + ranked}.values())
+    if not filtered:
         raise HTTPException(status_code=404, detail="No similar project names found.")
 
-    filtered = [proj for proj in candidates if proj["name"] in fuzzy_names]
     options_str = "\n".join(f"- {p['name']} (key: {p['key']})" for p in filtered)
 
     system_prompt = (
@@ -97,7 +955,7 @@ def _resolve_project_keys(human_input: str) -> List[str]:
     user_input = f"""
     The user provided this input: "{human_input}"
 
-    Here are possible project options:
+    Here are possible project options, most similar first:
     {options_str}
 
     From the list above, identify the project(s) referred to in the input.
@@ -116,12 +974,8 @@ def _resolve_project_keys(human_input: str) -> List[str]:
     if invalid_keys:
         raise HTTPException(status_code=400, detail=f"Claude returned invalid project keys: {invalid_keys}")
 
-    return selected_keys
-
+    return selected_keys, "llm"
 
-from datetime import datetime, timedelta
-import re
-import calendar
 
 def _parse_jira_date(input_str: str) -> str:
     """
@@ -202,26 +1056,24 @@ def _parse_jira_date(input_str: str) -> str:
     raise ValueError(f"Unrecognized date format: '{input_str}'")
 
 
-def find_existing_issue(jira: JIRA, project_key: str) -> Optional[str]:
+def find_existing_issue(project_key: str) -> Optional[str]:
     """
     Tries to find an existing issue in the form PROJECT_KEY-1 through PROJECT_KEY-5.
+    All candidates are probed with one batched search instead of one request each.
 
     Parameters:
-    - jira: An instance of the authenticated JIRA client.
     - project_key: The Jira project key (e.g., 'DELPROJ').
 
     Returns:
     - The first valid issue key found (e.g., 'DELPROJ-2'), or None if none exist.
     """
-    for i in range(1, 6):
-        issue_key = f"{project_key}-{i}"
-        try:
-            jira.issue(issue_key)
-            return issue_key
-        except Exception:
-            time.sleep(0.1)  # 100ms pause
+    candidates = [f"{project_key.strip().upper()}-{i}" for i in range(1, 6)]
+    try:
+        found = {issue.key for issue in _search_issue_chunk(candidates, ["summary"])}
+    except Exception:
+        return None
 
-    return None
+    return next((key for key in candidates if key in found), None)
 
 
 def get_all_jira_statuses() -> List[str]:
@@ -232,8 +1084,7 @@ def get_all_jira_statuses() -> List[str]:
         A list of status names (e.g. ['Open', 'In Progress', 'Resolved', 'Closed'])
     """
     try:
-        statuses = jira.statuses()
-        return [s.name for s in statuses]
+        return list(metadata_cache.get("statuses"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch Jira statuses: {e}")
 
@@ -245,8 +1096,7 @@ def get_all_jira_priorities() -> list[str]:
         A list of priority names (e.g. ['Highest', 'High', 'Medium', 'Low', 'Lowest'])
     """
     try:
-        priorities = jira.priorities()
-        return [p.name for p in priorities]
+        return list(metadata_cache.get("priorities"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch Jira priorities: {e}")
     
@@ -259,16 +1109,75 @@ def get_all_jira_projects() -> List[str]:
         A list of project names (e.g. ['UCB Italy', 'SLSP', 'CAF'])
     """
     try:
-        projects = jira.projects()
-        return [p.name for p in projects]  # or use p.key if you want keys
+        return [p["name"] for p in metadata_cache.get("projects")]  # or use p["key"] if you want keys
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch Jira projects: {e}")
+
+
+def get_all_jira_issue_types() -> List[str]:
+    """
+    Fetches all globally available Jira issue types.
+
+    Returns:
+        A de-duplicated, sorted list of issue type names (e.g. ['Bug', 'Epic', 'Task'])
+    """
+    try:
+        return list(metadata_cache.get("issue_types"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch global issue types: {e}")
     
 
+# Cache of natural-language -> JQL results; entries are tied to the metadata they were generated from
+jql_cache = TTLCache(
+    maxsize=int(os.getenv("JQL_CACHE_SIZE", "512")),
+    ttl=int(os.getenv("JQL_CACHE_TTL", "86400")),
+)
+_jql_cache_saved_seconds = 0.0
+_jql_cache_lock = threading.Lock()
+
+
+def _invalidate_jql_cache(entity: str) -> None:
+    if entity in ("projects", "priorities"):
+        jql_cache.clear()
+
+
+metadata_cache.subscribe(_invalidate_jql_cache)
+
+
+def _normalize_nl_query(text: str) -> str:
+    """
+    Folds case, punctuation and whitespace so trivially different phrasings share a cache entry.
+    """
+    text = re.sub(r"[^\w\s-]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def jql_cache_stats() -> dict:
+    with _jql_cache_lock:
+        saved = _jql_cache_saved_seconds
+    return {**jql_cache.stats(), "saved_latency_seconds": round(saved, 2)}
+
+
 def _generate_jql_from_input(user_input: str,) -> dict:
+    global _jql_cache_saved_seconds
+
     allowed_projects=get_all_jira_projects()
     allowed_priorities=get_all_jira_priorities()
 
+    cache_key = (
+        _normalize_nl_query(user_input),
+        metadata_cache.version("projects"),
+        metadata_cache.version("priorities"),
+    )
+    cached = jql_cache.get(cache_key)
+    cache_event("jql", hit=cached is not None)
+    if cached is not None:
+        with _jql_cache_lock:
+            _jql_cache_saved_seconds += cached["latency"]
+        return dict(cached["result"])
+
+    started = time.perf_counter()
+
     system_prompt = (
         "You are a Jira assistant that converts natural language requests into structured JSON "
         "for querying Jira issues.\n\n"
@@ -320,4 +1229,5 @@ Expected output format:
     if not isinstance(result, dict) or "jql" not in result or "max_results" not in result:
         raise ValueError(f"Claude did not return a valid structure: {result}")
 
-    return result
\ No newline at end of file
+    jql_cache.set(cache_key, {"result": result, "latency": time.perf_counter() - started})
+    return dict(result)
@@ -1,49 +1,94 @@
-import json
 import os
 import re
-import textwrap
+import time
 from typing import Dict, List, Optional
 # os.environ["MCP_AUTH_STRATEGY"] = "none" # Can be removed, explicit setting below is better
 
 from fastapi import HTTPException
-from fastmcp import FastMCP
-from jira import JIRA
+from fastmcp import Context, FastMCP
+from fastmcp.tools import ToolResult
+from starlette.responses import PlainTextResponse
 from dotenv import load_dotenv
-from helpers import _generate_jql_from_input, _parse_jira_date, _resolve_project_keys, extract_issue_fields, get_all_jira_priorities, get_all_jira_projects
-from utils.bedrock_wrapper import call_claude
+from helpers import ISSUE_FIELDS, ISSUE_MIRROR_MAX_STALENESS, JQL_MAX_PREFETCH_PARALLELISM, MIRROR_SORTABLE_COLUMNS, JQL_MAX_WINDOW, JQL_QUERY_FIELDS, SEARCH_FIELDS, _generate_jql_from_input, _match_project_keys, _parse_jira_date, acollect_jql_window_concurrent, afetch_issues_by_keys, collect_jql_window, decode_jql_cursor, extract_compact_issue, extract_extra_fields, extract_issue_fields, get_all_jira_issue_types, get_clean_comments_from_issue, issue_mirror_staleness, jql_cache_stats, metadata_cache, search_issue_mirror, semantic_issue_matches, refresh_issue_vectors, start_issue_mirror_sync, with_extra_fields
+from utils.bedrock_wrapper import astream_claude
+from utils.jira_client import acall_jira, jira_client_stats, run_blocking
+from utils.metrics import CONTENT_TYPE, ToolMetricsMiddleware, render_metrics
+from utils.summarize import summarize_tickets
+from utils.tracing import TraceMiddleware
 
 
 load_dotenv(override=True)
 
-JIRA_URL = os.getenv("JIRA_BASE_URL")
-JIRA_USER = os.getenv("JIRA_EMAIL")
-JIRA_TOKEN = os.getenv("JIRA_API_TOKEN")
+# Default number of tickets fetched concurrently by summarize_jira_tickets
+SUMMARY_FETCH_WORKERS = int(os.getenv("SUMMARY_FETCH_WORKERS", "8"))
 
+# Partial LLM output is relayed to the client once this many characters or seconds have accumulated
+STREAM_RELAY_CHARS = int(os.getenv("STREAM_RELAY_CHARS", "200"))
+STREAM_RELAY_INTERVAL = float(os.getenv("STREAM_RELAY_INTERVAL", "0.5"))
 
+try:
+    mcp = FastMCP("Jira MCP Server", auth=None, stateless_http=True)
+except TypeError:
+    # Newer fastmcp releases take stateless_http at run time instead; the SSE transport used below ignores it
+    mcp = FastMCP("Jira MCP Server", auth=None)
 
-jira = JIRA(server=JIRA_URL, basic_auth=(JIRA_USER, JIRA_TOKEN))
+# Call count, errors, latency and result size for every tool, served with the upstream metrics at /metrics
+mcp.add_middleware(ToolMetricsMiddleware())
+# Opt-in span tree of the upstream calls behind a tool call (`_trace` argument or x-mcp-trace header)
+mcp.add_middleware(TraceMiddleware())
 
-mcp = FastMCP("Jira MCP Server", auth=None, stateless_http=True)
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request):
+    """
+    Prometheus scrape endpoint, served next to the MCP transport.
+    """
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
+def _list_result(items: list, **meta) -> ToolResult:
+    """
+    The result fastmcp builds for a tool returning a list, plus `meta` in the result's `_meta`,
+    so list-returning tools can report how they got their answer without changing their payload.
+    """
+    return ToolResult(content=items, structured_content={"result": items}, meta={"fastmcp": {"wrap_result": True}, **meta})
+
+
+# Keeps the optional local issue mirror (JIRA_MIRROR_PROJECTS) current in the background
+start_issue_mirror_sync()
 
 @mcp.tool()
-def search_issues(jql: str, max_results: int = 5) -> list[dict]:
+async def search_issues(jql: str, max_results: int = 5, fields: list[str] = []) -> list[dict]:
     """
     Search Jira issues using a JQL query.
     Returns a list of issue keys and summaries.
+    Optional `fields` (e.g. ['labels', 'customfield_10010']) are returned raw under 'extra_fields'.
     """
-    issues = jira.search_issues(jql, maxResults=max_results)
-    return [{"key": issue.key, "summary": issue.fields.summary} for issue in issues]
+    issues = await acall_jira(
+        "search_issues",
+        jql,
+        maxResults=max_results,
+        fields=with_extra_fields(SEARCH_FIELDS, fields),
+    )
+    results = []
+    for issue in issues:
+        item = {"key": issue.key, "summary": issue.fields.summary}
+        if fields:
+            item["extra_fields"] = extract_extra_fields(issue, fields)
+        results.append(item)
+    return results
 
 
 
 @mcp.tool()
-def get_issue(key: str) -> dict:
+async def get_issue(key: str) -> dict:
     """
     Retrieve full details for a Jira issue by key.
     """
     try:
-        issue = jira.issue(key)
-        return extract_issue_fields(issue, include_comments=True, jira_client=jira)
+        # Comments come inline with the issue; only very long threads need extra requests
+        issue = await acall_jira("issue", key, fields=",".join(ISSUE_FIELDS + ["comment"]))
+        return await run_blocking(extract_issue_fields, issue, include_comments=True)
     except Exception as e:
         return {"error": str(e)}
 
@@ -52,54 +97,73 @@ def get_issue(key: str) -> dict:
 
 
 @mcp.tool()
-def get_available_issue_statuses(key: str) -> list[str]:
+async def get_issues(keys: list[str]) -> dict:
+    """
+    Retrieve details and comments for many Jira issues at once.
+    Issues are fetched with a few batched `key in (...)` searches instead of one request per key.
+
+    Returns:
+    - issues: issue details in the order the keys were given
+    - missing: keys that do not exist or are not visible to the current user
+    - errors: key -> error message for keys whose batch request failed
+    - aliases: requested key -> current key, for issues that were moved or renamed
+    """
+    batch = await afetch_issues_by_keys(keys)
+    issues = await run_blocking(
+        lambda: [extract_issue_fields(issue, include_comments=True) for issue in batch.issues]
+    )
+    return {
+        "issues": issues,
+        "missing": batch.missing,
+        "errors": batch.errors,
+        "aliases": batch.aliases,
+    }
+
+
+@mcp.tool()
+async def get_available_issue_statuses(key: str) -> list[str]:
     """
     Get the list of available statuses the given issue can transition to.
     This returns the display names of valid transitions for the issue's current workflow state.
     """
     try:
-        transitions = jira.transitions(key)
+        transitions = await acall_jira("transitions", key)
         return [t['to']['name'] for t in transitions]
     except Exception as e:
         return [f"Error: {str(e)}"]
 
 @mcp.tool()
-def list_projects() -> list[dict]:
+async def list_projects() -> list[dict]:
     """
     List all Jira projects visible to the current user.
     Each project includes its key and name (e.g., key='DEV', name='Development').
     Useful for discovering what project keys to use in JQL queries.
     """
     try:
-        projects = jira.projects()
-        return [{"key": p.key, "name": p.name} for p in projects]
+        projects = await run_blocking(metadata_cache.get, "projects")
+        return [{"key": p["key"], "name": p["name"]} for p in projects]
     except Exception as e:
         return [{"error": str(e)}]
 
 
 @mcp.tool
-def get_all_issue_types() -> List[str]:
+async def get_all_issue_types() -> List[str]:
     """
     Fetches all globally available issue types (task types) from Jira.
     Returns a de-duplicated, sorted list of issue type names.
     """
-    try:
-        global_issue_types = jira.issue_types()
-        issue_type_set = {it.name for it in global_issue_types}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch global issue types: {e}")
-
-    return sorted(issue_type_set)
+    return await run_blocking(get_all_jira_issue_types)
 
 
 @mcp.tool()
-def get_issue_with_comments(key: str) -> dict:
+async def get_issue_with_comments(key: str) -> dict:
     """
     Retrieve full Jira issue info with cleaned comments, priority, and task type.
     """
     try:
-        issue = jira.issue(key)
-        return extract_issue_fields(issue, include_comments=True, jira_client=jira)
+        # Comments come inline with the issue; only very long threads need extra requests
+        issue = await acall_jira("issue", key, fields=",".join(ISSUE_FIELDS + ["comment"]))
+        return await run_blocking(extract_issue_fields, issue, include_comments=True)
     except Exception as e:
         return {"error": str(e)}
 
@@ -107,7 +171,7 @@ def get_issue_with_comments(key: str) -> dict:
 
 
 @mcp.tool()
-def search_advanced_issues(
+async def search_advanced_issues(
     projects: list[str] = [],
     statuses: list[str] = [],
     priorities: list[str] = [],
@@ -116,16 +180,49 @@ def search_advanced_issues(
     updated_after: str = "",
     max_results: int = 10,
     sort_by: str = "created",
-    sort_order: str = "DESC"
+    sort_order: str = "DESC",
+    fields: list[str] = []
 ) -> list[dict]:
     """
     Search Jira issues using multiple filters:
     - Accepts lists for projects, statuses, priorities, assignees
     - Accepts created/updated date ranges in 'YYYY-MM-DD'
     - Supports sorting by any Jira field
+    - Optional `fields` are returned raw under 'extra_fields'
+
+    When all `projects` are in the local issue mirror and it synced recently enough, the query is
+    answered locally (sorting by created/updated, no extra fields, dates as 'YYYY-MM-DD'); otherwise
+    Jira is queried live, so relative dates such as '-7d' keep their JQL meaning.
 
     Returns a list of matching issues with key, summary, status, assignee, priority, created, updated.
+    The result's `_meta` reports `source` ('mirror' or 'jira') and `staleness_seconds`, the age
+    of the data (0 for live results).
     """
+    order = sort_order.upper() if sort_order.upper() in ("ASC", "DESC") else "DESC"
+
+    staleness = issue_mirror_staleness(projects)
+    if (
+        staleness is not None
+        and staleness <= ISSUE_MIRROR_MAX_STALENESS
+        and not fields
+        and sort_by.lower() in MIRROR_SORTABLE_COLUMNS
+        # The mirror compares dates as ISO strings; anything else ('-7d', '2025/01/02') goes to Jira
+        and all(re.fullmatch(r"\d{4}-\d{2}-\d{2}", d) for d in (created_after, updated_after) if d)
+    ):
+        issues = await run_blocking(
+            search_issue_mirror,
+            sort_by=sort_by.lower(),
+            order=order,
+            limit=max_results,
+            projects=projects,
+            statuses=statuses,
+            priorities=priorities,
+            assignees=assignees,
+            created_after=created_after,
+            updated_after=updated_after,
+        )
+        return _list_result(issues, source="mirror", staleness_seconds=round(staleness, 1))
+
     jql_parts = []
 
     if projects:
@@ -145,28 +242,72 @@ def search_advanced_issues(
     if updated_after:
         jql_parts.append(f'updated >= "{updated_after}"')
 
-    # Validate sort order
-    order = sort_order.upper()
-    if order not in ["ASC", "DESC"]:
-        order = "DESC"
-
     jql = " AND ".join(jql_parts) if jql_parts else ""
     jql += f' ORDER BY {sort_by} {order}'
 
     try:
-        issues = jira.search_issues(jql, maxResults=max_results)
-        return [
-            {
-                extract_issue_fields(issue)
-            }
-            for issue in issues
-        ]
+        issues = await acall_jira(
+            "search_issues",
+            jql,
+            maxResults=max_results,
+            fields=with_extra_fields(ISSUE_FIELDS, fields),
+        )
+        results = []
+        for issue in issues:
+            item = extract_issue_fields(issue)
+            if fields:
+                item["extra_fields"] = extract_extra_fields(issue, fields)
+            results.append(item)
+        return _list_result(results, source="jira", staleness_seconds=0)
     except Exception as e:
-        return [{"error": str(e), "jql": jql}]
+        return _list_result([{"error": str(e), "jql": jql}], source="jira", staleness_seconds=0)
+
+
+@mcp.tool()
+async def semantic_search_issues(query: str, projects: list[str], k: int = 10) -> Dict:
+    """
+    Find issues whose summary/description is similar in meaning to `query`, without writing JQL.
+    Backed by a local embedding index synced incrementally per project: only issues updated
+    since the last sync are read from Jira, and only changed texts are re-embedded.
+    A project's first index build runs in the background; until it completes, results only
+    cover the issues indexed so far.
+
+    Parameters:
+    - query: Free-text description of what you are looking for (e.g. 'login fails after password reset').
+    - projects: Project keys to search in (e.g. ['DEV', 'OPS']).
+    - k: Number of issues to return (default 10, max 50).
+
+    Returns:
+    - issues: best matches first, in the execute_jql_query format plus `score` (cosine similarity)
+    - sync: per-project sync counts ('skipped' when the index was synced recently), or
+      {"status": "building"} during the first index build / {"status": "syncing"} while another sync runs
+    """
+    project_keys = list(dict.fromkeys(p.strip().upper() for p in projects if p.strip()))
+    if not project_keys:
+        raise HTTPException(status_code=400, detail="At least one project key is required.")
+    if not query.strip():
+        raise HTTPException(status_code=400, detail="Query is empty.")
+    k = max(1, min(k, 50))
+
+    sync = {}
+    for project_key in project_keys:
+        try:
+            sync[project_key] = await run_blocking(refresh_issue_vectors, project_key)
+        except Exception as e:
+            sync[project_key] = {"error": str(e)}  # search whatever is already indexed
+
+    matches = await run_blocking(semantic_issue_matches, query, project_keys, k)
+    scores = dict(matches)
+    batch = await afetch_issues_by_keys(list(scores), fields=JQL_QUERY_FIELDS)
+    issues = [
+        {**extract_compact_issue(issue), "score": round(scores[issue.key], 4)}
+        for issue in batch.issues
+    ]
+    return {"issues": issues, "sync": sync}
 
 
 @mcp.tool()
-def resolve_project_key(human_input: str) -> List[str]:
+async def resolve_project_key(human_input: str) -> List[str]:
     """
     Resolve a Jira project key from human-friendly input.
     Fetches available Jira projects and chooses the best match.
@@ -175,9 +316,12 @@ def resolve_project_key(human_input: str) -> List[str]:
     - human_input: Human-friendly name of the project (e.g., 'website revamp').
 
     Returns:
-    - The matching Jira project key (e.g., 'WEBS'), or raises error if not found or invalid.
+    - The matching Jira project keys (e.g., ['WEBS']), or raises error if not found or invalid.
+      The result's `_meta.path` tells how the match was made: 'exact_key', 'exact_name',
+      'index' (local fuzzy index) or 'llm'.
     """
-    return _resolve_project_keys(human_input)
+    keys, path = await run_blocking(_match_project_keys, human_input)
+    return _list_result(keys, path=path)
 
 
 @mcp.tool()
@@ -199,20 +343,28 @@ def parse_jira_date(input_str: str) -> str:
     return _parse_jira_date(input_str)
 
 @mcp.tool
-def generate_jql_from_input(user_input: str) -> dict:
+async def generate_jql_from_input(user_input: str) -> dict:
     """
     Generates a JSON object containing:
     - a valid JQL query using only project, priority, and resolution status (resolved/unresolved/all)
     - an optional max_results value if the user requests a limit
     """
-    return _generate_jql_from_input(user_input)
+    return await run_blocking(_generate_jql_from_input, user_input)
 
 
 @mcp.tool
-def execute_jql_query(jql: str) -> List[Dict]:
+async def execute_jql_query(
+    jql: str,
+    fields: list[str] = [],
+    cursor: str = "",
+    max_results: int = 100,
+    parallel_pages: int = 0
+) -> Dict:
     """
-    Executes a JQL query and returns up to 100 matching issues (paginated internally).
-    
+    Executes a JQL query and returns one window of matching issues plus a cursor for the next one.
+    Call again with the same `jql` and the returned `next_cursor` to continue; pages are
+    streamed from Jira internally, so arbitrarily large result sets can be walked window by window.
+
     Fields returned per issue:
     - key
     - summary
@@ -224,161 +376,172 @@ def execute_jql_query(jql: str) -> List[Dict]:
     - project
     - resolution
     - priority
+    - extra_fields (only when `fields` is given)
 
     Parameters:
     - jql: The Jira Query Language string.
+    - fields: Optional extra Jira fields to return raw (e.g. ['labels', 'customfield_10010']).
+    - cursor: Opaque `next_cursor` from a previous call; empty to start from the first result.
+    - max_results: Issues per window (default 100, capped at JQL_MAX_WINDOW).
+    - parallel_pages: 0 streams pages one after another; N > 0 fetches the pages after the first
+      concurrently, up to N at a time (capped at JQL_MAX_PREFETCH_PARALLELISM). Useful for large exports.
 
     Returns:
-    - List of up to 100 issues in compact format.
+    - issues: list of issues in compact format
+    - total: total number of matches reported by Jira
+    - next_cursor: token for the next window, or null when there are no more results
     """
-    try:
-        start_at = 0
-        page_size = 50  # can be tuned if needed
-        total_collected = 0
-        max_limit = 100
-        results = []
-
-        while total_collected < max_limit:
-            remaining = max_limit - total_collected
-            page = jira.search_issues(
-                jql,
-                startAt=start_at,
-                maxResults=min(page_size, remaining),
-                expand="names"
-            )
-
-            for issue in page:
-                fields = issue.fields
-                results.append({
-                    "key": issue.key,
-                    "summary": fields.summary,
-                    "issue_type": getattr(fields.issuetype, "name", None),
-                    "status": getattr(fields.status, "name", None),
-                    "assignee": getattr(fields.assignee, "displayName", None) if fields.assignee else None,
-                    "created": fields.created,
-                    "updated": fields.updated,
-                    "project": getattr(fields.project, "key", None),
-                    "resolution": getattr(fields.resolution, "name", None) if fields.resolution else None,
-                    "priority": getattr(fields.priority, "name", None) if fields.priority else None,
-                })
-                total_collected += 1
-
-                if total_collected >= max_limit:
-                    break
-
-            if len(page) < page_size:
-                break  # no more pages
-
-            start_at += page_size
-
-        return results
+    start_at = decode_jql_cursor(cursor, jql) if cursor else 0
+    limit = max(1, min(max_results, JQL_MAX_WINDOW))
 
+    try:
+        if parallel_pages > 0:
+            parallelism = min(parallel_pages, JQL_MAX_PREFETCH_PARALLELISM)
+            return await acollect_jql_window_concurrent(jql, start_at, limit, fields, parallelism)
+        return await run_blocking(collect_jql_window, jql, start_at, limit, fields)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to execute JQL: {e}")
 
 
+async def _notify_progress(ctx: Optional[Context], progress: float, total: Optional[float], message: str) -> None:
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(progress=progress, total=total, message=message)
+    except Exception:
+        pass  # progress is best-effort; a client that stopped listening must not fail the tool
+
+
+async def _stream_llm_to_client(ctx: Optional[Context], system_prompt: str, user_input: str, base_progress: float = 0) -> str:
+    """
+    Streams a Claude completion and relays partial text to the MCP client as progress
+    notifications while it is generated. Returns the full completion.
+    Progress values continue from `base_progress` so they keep increasing across phases.
+    """
+    parts, pending = [], []
+    received, pending_chars = 0, 0
+    last_sent = time.monotonic()
+
+    async for chunk in astream_claude(system_prompt, user_input):
+        parts.append(chunk)
+        pending.append(chunk)
+        received += len(chunk)
+        pending_chars += len(chunk)
+
+        if pending_chars >= STREAM_RELAY_CHARS or time.monotonic() - last_sent >= STREAM_RELAY_INTERVAL:
+            await _notify_progress(ctx, base_progress + received, None, "".join(pending))
+            pending, pending_chars = [], 0
+            last_sent = time.monotonic()
+
+    if pending:
+        await _notify_progress(ctx, base_progress + received, None, "".join(pending))
+    return "".join(parts)
+
+
+def _ticket_for_summary(issue) -> Dict:
+    comment_text = "\n".join(
+        f"{c.get('author')}: {c.get('text', c.get('error'))}" for c in get_clean_comments_from_issue(issue)
+    )
+
+    return {
+        "key": issue.key,
+        "summary": issue.fields.summary,
+        "status": issue.fields.status.name,
+        "priority": getattr(issue.fields.priority, "name", None),
+        "assignee": getattr(issue.fields.assignee, "displayName", None),
+        "created": issue.fields.created,
+        "updated": issue.fields.updated,
+        "description": issue.fields.description or "",
+        "comments": comment_text
+    }
+
+
 @mcp.tool
-def summarize_jira_tickets(ticket_keys: List[str]) -> Dict:
+async def summarize_jira_tickets(
+    ticket_keys: List[str],
+    max_workers: Optional[int] = None,
+    ctx: Optional[Context] = None
+) -> Dict:
     """
     Fetches key details and comments for each Jira ticket, then summarizes them using LLM.
+    Tickets are fetched in batched `key in (...)` searches, at most `max_workers`
+    batches at a time (defaults to SUMMARY_FETCH_WORKERS).
+
+    Summarization is map-reduce: every ticket is summarized in parallel (long tickets are
+    chunked by estimated token count), then the executive summary is built from those
+    summaries and streamed to the client as progress notifications as it is generated.
 
     Returns:
     - executive_summary: high-level overview of all tickets
     - ticket_summaries: mapping of ticket key to its summary
+    - errors: mapping of ticket key to the reason it could not be fetched or summarized
     """
     try:
-        ticket_data = []
-
-        for key in ticket_keys:
-            try:
-                issue = jira.issue(key, expand="renderedFields")
-                comments = jira.comments(key)
-
-                summary = issue.fields.summary
-                status = issue.fields.status.name
-                priority = getattr(issue.fields.priority, "name", None)
-                assignee = getattr(issue.fields.assignee, "displayName", None)
-                created = issue.fields.created
-                updated = issue.fields.updated
-                description = issue.fields.description or ""
-
-                comment_text = "\n".join(
-                    f"{c.author.displayName}: {c.body}" for c in comments
-                )
-
-                ticket_data.append({
-                    "key": key,
-                    "summary": summary,
-                    "status": status,
-                    "priority": priority,
-                    "assignee": assignee,
-                    "created": created,
-                    "updated": updated,
-                    "description": description,
-                    "comments": comment_text
-                })
-            except Exception as e:
-                ticket_data.append({
-                    "key": key,
-                    "error": f"Failed to fetch ticket: {str(e)}"
-                })
-
-        # Prepare input for LLM
-        formatted_input = "\n\n".join([
-            textwrap.dedent(f"""
-            Ticket {t['key']}:
-            Summary: {t.get('summary', '')}
-            Status: {t.get('status', '')}
-            Priority: {t.get('priority', '')}
-            Assignee: {t.get('assignee', '')}
-            Created: {t.get('created', '')}
-            Updated: {t.get('updated', '')}
-
-            Description:
-            {t.get('description', '')}
-
-            Comments:
-            {t.get('comments', '')}
-            """).strip()
-            for t in ticket_data if "error" not in t
-        ])
-
-        system_prompt = (
-            "You are an expert Jira analyst. The user will provide raw issue data including "
-            "summaries, statuses, priorities, and comments.\n\n"
-            "Your task:\n"
-            "1. Write a high-level 'executive_summary' that captures important patterns, updates, progress, blockers, or risks across all tickets.\n"
-            "2. For each ticket, return a concise summary (2–4 sentences) under 'ticket_summaries' keyed by ticket ID.\n\n"
-            "FORMAT:\n"
-            "{\n"
-            "  \"executive_summary\": \"...\",\n"
-            "  \"ticket_summaries\": {\n"
-            "    \"TICKET-123\": \"summary...\",\n"
-            "    \"TICKET-456\": \"summary...\"\n"
-            "  }\n"
-            "}\n"
-            "- Return ONLY valid JSON. Do not include markdown, comments, or explanation.\n"
-            "- Ensure all JSON is syntactically correct (no trailing commas, correct quoting, etc.)."
+        batch = await afetch_issues_by_keys(
+            ticket_keys,
+            fields=ISSUE_FIELDS + ["description"],
+            max_workers=max_workers or SUMMARY_FETCH_WORKERS,
         )
 
-        user_input = f"""
-        Here is the data for multiple Jira tickets:
+        fetched = await run_blocking(
+            lambda: {issue.key: _ticket_for_summary(issue) for issue in batch.issues}
+        )
+        ticket_data = [
+            fetched.get(key) or {
+                "key": key,
+                "error": f"Failed to fetch ticket: {batch.errors.get(key, 'issue not found')}"
+            }
+            for key in dict.fromkeys(batch.aliases.get(k, k) for k in (k.strip().upper() for k in ticket_keys))
+        ]
+        await _notify_progress(ctx, 0, None, f"Fetched {len(fetched)} of {len(ticket_data)} tickets, summarizing...")
 
-        {formatted_input}
-        """
+        tickets = [t for t in ticket_data if "error" not in t]
 
-        response = call_claude(system_prompt=system_prompt, user_input=user_input)
-        fenced = re.search(r"\{.*\}", response, re.DOTALL)
-        response_json = fenced.group(0) if fenced else response
+        async def on_ticket_summarized(done: int, total: int, message: str) -> None:
+            await _notify_progress(ctx, done, total + 1, message)
 
-        return json.loads(response_json)
+        result = await summarize_tickets(
+            tickets,
+            final_call=lambda system_prompt, user_input: _stream_llm_to_client(
+                ctx, system_prompt, user_input, base_progress=len(tickets)
+            ),
+            progress=on_ticket_summarized,
+        )
+        result["errors"].update({t["key"]: t["error"] for t in ticket_data if "error" in t})
+        return result
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to summarize Jira tickets: {e}")
 
 
+@mcp.tool
+def get_cache_stats() -> Dict:
+    """
+    Returns hit/miss counters and entry ages for the server's in-process caches, plus
+    Jira client counters (including calls coalesced into an identical in-flight request).
+    """
+    return {
+        "metadata": metadata_cache.stats(),
+        "jql_generation": jql_cache_stats(),
+        "jira_client": jira_client_stats(),
+    }
+
+
+@mcp.tool
+def invalidate_metadata_cache(entity: str = "") -> Dict:
+    """
+    Drops cached Jira metadata so the next call reloads it from Jira.
+
+    Parameters:
+    - entity: One of 'projects', 'priorities', 'statuses', 'issue_types', or empty for all.
+    """
+    if entity and entity not in metadata_cache.stats()["entities"]:
+        raise HTTPException(status_code=400, detail=f"Unknown metadata entity: {entity}")
+    metadata_cache.invalidate(entity or None)
+    return {"invalidated": entity or "all"}
+
 
 
 
 if __name__ == "__main__":
-    mcp.run(transport="sse", host="127.0.0.1", port=8001)  # run 'fastmcp run main.py --transport sse --port 8001'
\ No newline at end of file
+    mcp.run(transport="sse", host="127.0.0.1", port=8001)  # run 'fastmcp run main.py --transport sse --port 8001'
@@ -13,6 +13,7 @@ EXAMPLE_PROJECT_KEY = "DELTP"
 EXAMPLE_INPUTS = {
     "get_issue": {"key": EXAMPLE_ISSUE_KEY},
     "get_issue_with_comments": {"key": EXAMPLE_ISSUE_KEY},
+    "get_issues": {"keys": [EXAMPLE_ISSUE_KEY]},
     "get_available_issue_statuses": {"key": EXAMPLE_ISSUE_KEY},
     "search_issues": {"jql": EXAMPLE_JQL},
     "search_advanced_issues": {
@@ -28,6 +29,7 @@ EXAMPLE_INPUTS = {
     },
     "list_projects": {}, 
     "resolve_project_key": {"human_input" : "UniCredit Italy"},
+    "semantic_search_issues": {"query": "login fails after password reset", "projects": [EXAMPLE_PROJECT_KEY], "k": 3},
     "parse_jira_date" : {"input_str" : "1 JUL 2025"}
 }
 
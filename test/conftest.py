@@ -0,0 +1,31 @@
+"""
+Shared setup for the offline tests: `python -m pytest test/` from the repository root.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fakes import disable_dotenv, use_fakes
+
+disable_dotenv()
+
+
+@pytest.fixture(scope="session")
+def fake_services():
+    """
+    Fake Jira and Bedrock servers, with the server configuration pointed at them. main, helpers
+    and utils read that configuration on import, so tests import them only inside fixtures that
+    depend on this one.
+    """
+    from bench.fake_bedrock import FakeBedrockServer
+    from bench.fake_jira import FakeJiraServer, JiraDataset
+
+    jira_server = FakeJiraServer(JiraDataset(projects=3, issues_per_project=20)).start()
+    bedrock_server = FakeBedrockServer().start()
+    use_fakes(jira_server, bedrock_server)
+    yield jira_server, bedrock_server
+    jira_server.stop()
+    bedrock_server.stop()
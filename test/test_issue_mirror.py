@@ -0,0 +1,43 @@
+"""
+Checks which searches search_advanced_issues answers from the local issue mirror, against the fake Jira.
+"""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def mirrored(fake_services, monkeypatch, tmp_path):
+    import helpers
+    import main
+    from utils.issue_mirror import IssueMirror
+
+    monkeypatch.setattr(helpers, "issue_mirror", IssueMirror(str(tmp_path / "mirror.sqlite3")))
+    monkeypatch.setattr(helpers, "ISSUE_MIRROR_PROJECTS", ["P1"])
+    helpers.sync_issue_mirror("P1")
+    return main
+
+
+def _search(main, **arguments):
+    from fastmcp import Client
+
+    async def call():
+        async with Client(main.mcp) as client:
+            return await client.call_tool("search_advanced_issues", {"projects": ["P1"], **arguments})
+
+    return asyncio.run(call())
+
+
+def test_iso_dates_are_answered_from_the_mirror(mirrored):
+    result = _search(mirrored, created_after="2020-01-01", max_results=5)
+    assert result.meta["source"] == "mirror"
+    assert isinstance(result.data, list) and len(result.data) == 5
+    assert all(issue["key"].startswith("P1-") for issue in result.data)
+
+
+@pytest.mark.parametrize("created_after", ["-7d", "2025/01/02"])
+def test_other_date_forms_go_to_jira(mirrored, created_after):
+    result = _search(mirrored, created_after=created_after)
+    assert result.meta["source"] == "jira"
+    assert result.meta["staleness_seconds"] == 0
+    assert isinstance(result.data, list)
@@ -0,0 +1,29 @@
+"""
+Checks that issue vector syncs against the fake Jira keep each project's index in step with Jira.
+"""
+import pytest
+
+
+@pytest.fixture
+def helpers(fake_services):
+    import helpers
+    return helpers
+
+
+def _indexed(helpers, project_key):
+    return sorted(key for key in helpers.issue_vectors.keys if key.startswith(f"{project_key}-"))
+
+
+def test_full_sync_drops_issues_missing_from_jira(helpers, fake_services, monkeypatch):
+    dataset = fake_services[0].dataset
+    helpers.sync_issue_vectors("P2", force=True)
+    assert len(_indexed(helpers, "P2")) == 20
+
+    monkeypatch.setattr(dataset, "issues_per_project", 15)  # P2-16..P2-20 deleted or moved away
+    assert not helpers.sync_issue_vectors("P2", force=True)["full"]
+    assert len(_indexed(helpers, "P2")) == 20  # a delta sync cannot see them go
+
+    monkeypatch.setattr(helpers, "ISSUE_VECTOR_FULL_SYNC_INTERVAL", 0)
+    stats = helpers.sync_issue_vectors("P2")
+    assert stats["full"] and stats["removed"] == 5
+    assert _indexed(helpers, "P2") == sorted(f"P2-{n}" for n in range(1, 16))
@@ -0,0 +1,85 @@
+"""
+Checks single-flight coalescing of identical Jira read calls, with the upstream call stubbed out.
+"""
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def jira_client(fake_services, monkeypatch):
+    import utils.jira_client as jira_client
+    monkeypatch.setattr(jira_client, "JIRA_SINGLE_FLIGHT", True)
+    return jira_client
+
+
+def _blocking_upstream(jira_client, monkeypatch, result=None, error=None):
+    calls, release = [], threading.Event()
+
+    def upstream(priority, method, args, kwargs):
+        calls.append((method, args))
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    monkeypatch.setattr(jira_client, "_call_upstream", upstream)
+    return calls, release
+
+
+def _run_concurrently(jira_client, release, n, method, *args):
+    coalesced_before = jira_client.jira_client_stats()["coalesced_calls"]
+    results = [None] * n
+
+    def call(i):
+        try:
+            results[i] = jira_client.call_jira(method, *args)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while jira_client.jira_client_stats()["coalesced_calls"] - coalesced_before < n - 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_identical_reads_share_one_upstream_call(jira_client, monkeypatch):
+    issue = object()
+    calls, release = _blocking_upstream(jira_client, monkeypatch, result=issue)
+    results = _run_concurrently(jira_client, release, 4, "issue", "P1-1")
+    assert calls == [("issue", ("P1-1",))]
+    assert all(result is issue for result in results)
+    assert jira_client.jira_client_stats()["in_flight"] == 0
+
+
+def test_followers_get_the_leaders_error(jira_client, monkeypatch):
+    calls, release = _blocking_upstream(jira_client, monkeypatch, error=RuntimeError("Jira is down"))
+    results = _run_concurrently(jira_client, release, 3, "issue", "P1-2")
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_writes_are_never_coalesced(jira_client, monkeypatch):
+    calls, release = _blocking_upstream(jira_client, monkeypatch)
+    release.set()
+    jira_client.call_jira("add_comment", "P1-1", "hello")
+    jira_client.call_jira("add_comment", "P1-1", "hello")
+    assert len(calls) == 2
+
+
+def test_latency_is_labelled_by_endpoint_template(jira_client):
+    from utils.metrics import jira_request_duration
+
+    jira_client.call_jira("issue", "P3-7")
+    jira_client.call_jira("comments", "P3-7", start_at=0, max_results=5)
+    labels = set(jira_request_duration._series)
+    assert ("GET", "/rest/api/2/issue/{key}", "200") in labels
+    assert ("GET", "/rest/api/2/issue/{key}/comment", "200") in labels
+    assert not any("P3-7" in endpoint for _, endpoint, _ in labels)
@@ -0,0 +1,62 @@
+"""
+Checks execute_jql_query's cursor windows and concurrent page prefetch against the fake Jira.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+JQL = "project = P1 ORDER BY key ASC"
+
+
+@pytest.fixture
+def helpers(fake_services):
+    import helpers
+    return helpers
+
+
+def test_cursor_round_trip(helpers):
+    cursor = helpers.encode_jql_cursor(JQL, 40)
+    assert helpers.decode_jql_cursor(cursor, JQL) == 40
+
+
+def test_cursor_for_another_query_is_rejected(helpers):
+    cursor = helpers.encode_jql_cursor(JQL, 40)
+    with pytest.raises(HTTPException) as error:
+        helpers.decode_jql_cursor(cursor, "project = P2 ORDER BY key ASC")
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        helpers.decode_jql_cursor("not a cursor", JQL)
+
+
+def test_windows_cover_every_issue_once(helpers):
+    keys, cursor = [], None
+    while True:
+        start_at = helpers.decode_jql_cursor(cursor, JQL) if cursor else 0
+        window = helpers.collect_jql_window(JQL, start_at, limit=7)
+        keys += [issue["key"] for issue in window["issues"]]
+        cursor = window["next_cursor"]
+        if cursor is None:
+            break
+    assert keys == [f"P1-{n}" for n in range(1, 21)]
+
+
+def test_concurrent_window_fills_short_pages(helpers, monkeypatch):
+    monkeypatch.setattr(helpers, "JQL_PAGE_SIZE", 5)
+    call_jira_bulk = helpers.call_jira_bulk
+    shortened = []
+
+    def short_second_page(method, jql, startAt=0, **kwargs):
+        page = call_jira_bulk(method, jql, startAt=startAt, **kwargs)
+        if startAt == 5 and not shortened:  # one page comes back two issues short
+            shortened.append(startAt)
+            return list(page)[:-2]
+        return page
+
+    monkeypatch.setattr(helpers, "call_jira_bulk", short_second_page)
+    window = asyncio.run(helpers.acollect_jql_window_concurrent(JQL, 0, limit=20, parallelism=3))
+
+    assert shortened == [5]
+    assert [issue["key"] for issue in window["issues"]] == [f"P1-{n}" for n in range(1, 21)]
+    assert window["next_cursor"] is None
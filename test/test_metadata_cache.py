@@ -0,0 +1,53 @@
+"""
+Offline checks for metadata change detection and the JQL cache that depends on it.
+"""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def helpers(fake_services):
+    import helpers
+    return helpers
+
+
+def _rename_projects(helpers, monkeypatch, suffix: str) -> None:
+    load = helpers.metadata_cache._loaders["projects"]
+    monkeypatch.setitem(helpers.metadata_cache._loaders, "projects", lambda: [{**p, "name": p["name"] + suffix} for p in load()])
+
+
+def test_invalidate_detects_changed_data(helpers, monkeypatch):
+    metadata_cache = helpers.metadata_cache
+    changed = []
+    metadata_cache.subscribe(changed.append)
+    metadata_cache.get("projects")
+    version = metadata_cache.version("projects")
+
+    _rename_projects(helpers, monkeypatch, " (renamed)")
+    metadata_cache.invalidate("projects")
+    projects = metadata_cache.get("projects")
+
+    assert all(p["name"].endswith(" (renamed)") for p in projects)
+    assert metadata_cache.version("projects") == version + 1
+    assert "projects" in changed
+
+
+def test_invalidate_without_change_keeps_version(helpers):
+    metadata_cache = helpers.metadata_cache
+    metadata_cache.get("priorities")
+    version = metadata_cache.version("priorities")
+    metadata_cache.invalidate("priorities")
+    metadata_cache.get("priorities")
+    assert metadata_cache.version("priorities") == version
+
+
+def test_jql_cache_misses_after_invalidate_with_changed_projects(helpers, monkeypatch):
+    jql_cache = helpers.jql_cache
+    helpers._generate_jql_from_input("open bugs in the payments project")
+    misses = jql_cache.misses
+    helpers._generate_jql_from_input("open bugs in the payments project")
+    assert jql_cache.misses == misses  # served from the cache
+
+    _rename_projects(helpers, monkeypatch, " v2")
+    helpers.metadata_cache.invalidate("projects")
+    helpers._generate_jql_from_input("open bugs in the payments project")
+    assert jql_cache.misses == misses + 1
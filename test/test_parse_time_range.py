@@ -0,0 +1,76 @@
+"""
+Table-driven checks for the local time range grammar, with a pinned "today".
+"""
+from datetime import date
+
+import pytest
+
+TODAY = date(2025, 7, 16)  # a Wednesday
+
+CASES = [
+    # Shorthands and their spelled-out forms: rolling windows ending today
+    ("-1w", "2025-07-09", "2025-07-16"),
+    ("3d", "2025-07-13", "2025-07-16"),
+    ("-2m", "2025-05-16", "2025-07-16"),
+    ("-1y", "2024-07-16", "2025-07-16"),
+    ("2w", "2025-07-02", "2025-07-16"),
+    ("2 weeks", "2025-07-02", "2025-07-16"),
+    ("two weeks", "2025-07-02", "2025-07-16"),
+    ("three days", "2025-07-13", "2025-07-16"),
+    # Rolling windows
+    ("last two weeks", "2025-07-02", "2025-07-16"),
+    ("past 30 days", "2025-06-16", "2025-07-16"),
+    ("last 3 months", "2025-04-16", "2025-07-16"),
+    ("past week", "2025-07-09", "2025-07-16"),
+    # Named periods
+    ("today", "2025-07-16", "2025-07-16"),
+    ("yesterday", "2025-07-15", "2025-07-15"),
+    ("this week", "2025-07-14", "2025-07-20"),
+    ("last week", "2025-07-07", "2025-07-13"),
+    ("next month", "2025-08-01", "2025-08-31"),
+    ("last quarter", "2025-04-01", "2025-06-30"),
+    ("this year", "2025-01-01", "2025-12-31"),
+    ("year to date", "2025-01-01", "2025-07-16"),
+    ("QTD", "2025-07-01", "2025-07-16"),
+    # Explicit ranges
+    ("2025-01-12 to 2025-01-20", "2025-01-12", "2025-01-20"),
+    ("from Jan 2025 until Mar 2025", "2025-01-01", "2025-03-31"),
+    ("between 2025-01-01 and 2025-02-15", "2025-01-01", "2025-02-15"),
+    # Open-ended ranges
+    ("before 2024-01-01", None, "2023-12-31"),
+    ("older than 2 weeks", None, "2025-07-01"),
+    ("after 2025-06-30", "2025-07-01", None),
+    ("newer than 2025 Jun", "2025-07-01", None),
+    ("since 2025-06-01", "2025-06-01", None),
+    ("until 2025-03-31", None, "2025-03-31"),
+    # Single points
+    ("2025-07-01", "2025-07-01", "2025-07-01"),
+    ("June 2025", "2025-06-01", "2025-06-30"),
+    ("Q2 2025", "2025-04-01", "2025-06-30"),
+    ("2025", "2025-01-01", "2025-12-31"),
+    ("2 weeks ago", "2025-07-02", "2025-07-02"),
+    ("1 Jul 2025", "2025-07-01", "2025-07-01"),
+]
+
+
+@pytest.fixture
+def parse_time_range(fake_services, monkeypatch):
+    import utils.parse_time_range as parse_time_range
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError("expression should have been parsed locally")
+
+    monkeypatch.setattr(parse_time_range, "get_today", lambda: TODAY)
+    monkeypatch.setattr(parse_time_range, "call_claude", no_llm)
+    return parse_time_range
+
+
+def test_local_grammar(parse_time_range):
+    failures = []
+    for text, time_from, time_to in CASES:
+        expected = {"time_from": time_from, "time_to": time_to}
+        actual = parse_time_range.parse_time_range_to_bounds(text)
+        if actual != expected:
+            failures.append(f"{text!r}: expected {expected}, got {actual}")
+    assert not failures, "\n".join(failures)
+
@@ -0,0 +1,26 @@
+"""
+Checks for the local project lookup that answers resolve_project_key without the LLM.
+"""
+from utils.project_index import ProjectIndex
+
+PROJECTS = [
+    {"key": "RND", "name": "Research and Development"},
+    {"key": "RES", "name": "Research"},
+    {"key": "DEV", "name": "Development"},
+    {"key": "PAY", "name": "Payments, Billing"},
+]
+
+
+def test_whole_name_with_separator_matches_before_splitting():
+    index = ProjectIndex(PROJECTS)
+    assert index.exact("Research and Development") == ("exact_name", ["RND"])
+    assert index.exact("research and development project") is None  # filler words go to ranking
+    assert index.exact("payments, billing") == ("exact_name", ["PAY"])
+
+
+def test_separated_names_and_keys_still_split():
+    index = ProjectIndex(PROJECTS)
+    assert index.exact("Research, Development") == ("exact_name", ["RES", "DEV"])
+    assert index.exact("res and dev") == ("exact_key", ["RES", "DEV"])
+    assert index.exact("rnd") == ("exact_key", ["RND"])
+    assert index.exact("Research and Marketing") is None
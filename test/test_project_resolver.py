@@ -0,0 +1,36 @@
+"""
+Checks that embedding similarity alone never resolves a project key.
+"""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def helpers(fake_services):
+    import helpers
+    return helpers
+
+
+def test_semantic_resolver_is_off_by_default(helpers):
+    assert helpers.PROJECT_SEMANTIC_RESOLVER is False
+
+
+def test_near_miss_semantic_match_goes_to_the_llm(helpers, monkeypatch):
+    projects = helpers.metadata_cache.get("projects")
+    near_miss, other = projects[0], projects[1]
+    prompts = []
+
+    def claude(system_prompt, user_input):
+        prompts.append(user_input)
+        return ""  # none of the candidates is the project the user meant
+
+    monkeypatch.setattr(helpers, "PROJECT_SEMANTIC_RESOLVER", True)
+    # Scores far above any threshold the resolver used to trust, for a name sharing only a domain word
+    monkeypatch.setattr(helpers, "_semantic_project_matches", lambda text: [(near_miss, 0.83), (other, 0.41)])
+    monkeypatch.setattr(helpers, "call_claude", claude)
+
+    keys, path = helpers._match_project_keys("billing portal")
+
+    assert (keys, path) == ([], "llm")
+    assert len(prompts) == 1
+    candidates = [line.strip() for line in prompts[0].splitlines() if line.strip().startswith("- ")]
+    assert candidates[0] == f"- {near_miss['name']} (key: {near_miss['key']})"
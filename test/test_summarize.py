@@ -0,0 +1,40 @@
+"""
+Checks for the reduce step of ticket summarization, with the LLM stubbed out.
+"""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def summarize(fake_services, monkeypatch):
+    import utils.summarize as summarize
+    monkeypatch.setattr(summarize, "REDUCE_TOKEN_BUDGET", 100)
+    return summarize
+
+
+def test_groups_hold_whole_summaries(summarize):
+    entries = [f"P1-{i}: " + "word " * 40 for i in range(5)]  # ~52 tokens each
+    groups = summarize.group_by_tokens(entries, 120)
+    assert [entry for group in groups for entry in group] == entries
+    assert [len(group) for group in groups] == [2, 2, 1]
+    assert summarize.group_by_tokens(["x" * 1000], 10) == [["x" * 1000]]
+
+
+def test_reduce_stops_when_condensing_does_not_shrink(summarize, monkeypatch):
+    condense_inputs = []
+
+    async def echo(system_prompt, user_input):
+        condense_inputs.append(user_input)
+        return user_input  # a condensed group as long as its input
+
+    async def final(system_prompt, user_input):
+        return "executive summary"
+
+    monkeypatch.setattr(summarize, "acall_claude", echo)
+    summaries = {f"P1-{i}": "word " * 40 for i in range(8)}
+
+    assert asyncio.run(summarize.reduce_summaries(summaries, final_call=final)) == "executive summary"
+    assert len(condense_inputs) <= len(summaries)
+    for text in condense_inputs:  # no summary is ever split across two condensing calls
+        assert all(line.startswith("P1-") for line in text.split("\n\n"))
@@ -0,0 +1,97 @@
+"""
+Deterministic checks for UpstreamScheduler: a fake clock, and waits that advance it instead of sleeping.
+"""
+import pytest
+
+from utils.upstream_scheduler import BULK, INTERACTIVE, UpstreamScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.waits = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def wait(self, timeout=None) -> bool:
+        self.waits.append(timeout)
+        self.now += timeout
+        return False
+
+
+def _scheduler(clock: FakeClock, **kwargs) -> UpstreamScheduler:
+    scheduler = UpstreamScheduler(clock=clock, **kwargs)
+    scheduler._cond.wait = clock.wait
+    return scheduler
+
+
+def test_admits_at_the_configured_rate():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_rate=2.0, burst=1)
+    scheduler.acquire()
+    assert clock.waits == []
+    scheduler.acquire()
+    assert clock.waits == [pytest.approx(0.5)]
+
+
+def test_throttle_halves_the_rate_and_success_adds_it_back():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_rate=8.0, burst=1, increase=1.0)
+
+    assert scheduler.on_throttled(retry_after=1.0) == 1.0
+    assert scheduler.stats()["rate_per_second"] == 4.0
+    scheduler.on_throttled(retry_after=1.0)  # in flight when the first throttle arrived: counts once
+    assert scheduler.stats()["rate_per_second"] == 4.0
+
+    scheduler.on_success()
+    assert scheduler.stats()["rate_per_second"] == 4.25  # + increase / rate
+    for _ in range(100):
+        scheduler.on_success()
+    assert scheduler.stats()["rate_per_second"] == 8.0  # never above max_rate
+
+
+def test_rate_never_drops_below_min_rate():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_rate=1.0, burst=1, min_rate=0.5)
+    for _ in range(5):
+        scheduler.on_throttled(retry_after=0)
+        clock.now += 1
+    assert scheduler.stats()["rate_per_second"] == 0.5
+
+
+def test_retry_after_pauses_all_admissions():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_rate=100.0, burst=10)
+    scheduler.on_throttled(retry_after=3.0)
+    assert scheduler.stats()["paused_seconds"] == 3.0
+
+    paused_until = clock.now + 3.0
+    scheduler.acquire()
+    assert clock.now >= paused_until
+    assert clock.waits[0] == pytest.approx(3.0)
+
+
+def test_unlimited_until_the_first_throttle():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_rate=None, burst=1)
+    for _ in range(10):
+        scheduler.acquire()
+        clock.now += 0.05
+    assert clock.waits == []
+    assert scheduler.stats()["rate_per_second"] is None
+
+    scheduler.on_throttled(retry_after=1.0)
+    assert scheduler.stats()["rate_per_second"] == 5.0  # half of the 10 admitted over the last second
+
+
+def test_bulk_request_is_promoted_after_bulk_max_wait():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, max_rate=None, burst=1, bulk_max_wait=2.0)
+    scheduler._waiting[INTERACTIVE].append((object(), clock.now))  # an interactive request ahead in line
+
+    enqueued = clock.now
+    scheduler.acquire(BULK)
+    assert clock.now - enqueued == pytest.approx(2.0)
+    stats = scheduler.stats()
+    assert stats["admitted_bulk"] == 1 and stats["admitted_interactive"] == 0
@@ -1,95 +1,344 @@
+import asyncio
+import functools
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
+import numpy as np
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectTimeoutError, EndpointConnectionError, ReadTimeoutError
 from dotenv import load_dotenv
 from fastapi import HTTPException
 
+from utils.embedding_cache import embedding_cache
+from utils.metrics import bedrock_request_duration, bedrock_tokens
+from utils.tracing import cache_event, propagate, span
+
 load_dotenv(override=True)
 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION")
 
-MODEL_ID = os.getenv("BEDROCK_MODEL_ID")  
-# INFERENCE_ARN = os.getenv("BEDROCK_INFERENCE_CONFIG_ARN")  
+MODEL_ID = os.getenv("BEDROCK_MODEL_ID")
+EMBEDDING_MODEL_ID = os.getenv("BEDROCK_EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0")
+# INFERENCE_ARN = os.getenv("BEDROCK_INFERENCE_CONFIG_ARN")
+
+# Max model invocations in flight; further calls queue instead of being throttled by Bedrock
+BEDROCK_MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "4"))
 
+# One shared client: pooled connections, explicit timeouts, and adaptive retries
+# (exponential backoff with jitter plus client-side rate limiting on throttling errors)
 bedrock_client = boto3.client(
     service_name="bedrock-runtime",
     region_name=AWS_REGION,
+    endpoint_url=os.getenv("BEDROCK_ENDPOINT_URL") or None,  # e.g. a VPC endpoint or bench/fake_bedrock.py
     aws_access_key_id=AWS_ACCESS_KEY_ID,
     aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+    config=Config(
+        max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "32")),
+        connect_timeout=float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "5")),
+        read_timeout=float(os.getenv("BEDROCK_READ_TIMEOUT", "120")),
+        retries={"total_max_attempts": int(os.getenv("BEDROCK_MAX_ATTEMPTS", "6")), "mode": "adaptive"},
+    ),
 )
 
+_model_slots = threading.BoundedSemaphore(BEDROCK_MAX_CONCURRENCY)
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BEDROCK_EXECUTOR_WORKERS", "16")),
+    thread_name_prefix="bedrock",
+)
 
-# --- Claude Generation via signed HTTP request ---
-def call_claude(system_prompt: str, user_input: str) -> str:
-    body = {
+# Embedding requests in flight per fetch_embeddings batch (still bounded by _model_slots overall).
+# A separate pool, so batches started from the shared executor cannot starve themselves.
+EMBEDDING_BATCH_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_CONCURRENCY", "4"))
+_embedding_executor = ThreadPoolExecutor(
+    max_workers=EMBEDDING_BATCH_CONCURRENCY,
+    thread_name_prefix="bedrock-embed",
+)
+
+THROTTLING_ERRORS = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+
+
+def _to_http_exception(e: Exception, what: str) -> HTTPException:
+    """
+    Maps Bedrock/botocore failures to meaningful HTTP statuses instead of a blanket 500.
+    """
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, ClientError):
+        code = e.response.get("Error", {}).get("Code", "")
+        if code in THROTTLING_ERRORS:
+            return HTTPException(status_code=429, detail=f"{what} throttled by Bedrock after retries: {e}")
+        if code == "ModelTimeoutException":
+            return HTTPException(status_code=504, detail=f"{what} timed out: {e}")
+        if code == "ValidationException":
+            return HTTPException(status_code=400, detail=f"{what} rejected: {e}")
+        if code in ("ServiceUnavailableException", "ModelNotReadyException"):
+            return HTTPException(status_code=503, detail=f"{what} unavailable: {e}")
+    if isinstance(e, (ReadTimeoutError, ConnectTimeoutError)):
+        return HTTPException(status_code=504, detail=f"{what} timed out: {e}")
+    if isinstance(e, EndpointConnectionError):
+        return HTTPException(status_code=503, detail=f"{what} unavailable: {e}")
+    return HTTPException(status_code=500, detail=f"{what} failed: {str(e)}")
+
+
+def _record_tokens(model_id: str, usage: dict, current_span=None) -> None:
+    """
+    Counts the tokens a response reports: Claude's usage block or Titan's inputTextTokenCount.
+    """
+    if usage.get("input_tokens"):
+        bedrock_tokens.inc(model_id, "input", amount=usage["input_tokens"])
+        if current_span is not None:
+            current_span.set(input_tokens=usage["input_tokens"])
+    if usage.get("output_tokens"):
+        bedrock_tokens.inc(model_id, "output", amount=usage["output_tokens"])
+        if current_span is not None:
+            current_span.set(output_tokens=usage["output_tokens"])
+
+
+def _invoke_model(model_id: str, body: dict) -> dict:
+    """
+    Invokes a model through the shared client, holding one of the BEDROCK_MAX_CONCURRENCY slots.
+    """
+    request = json.dumps(body)
+    with span("bedrock invoke", model=model_id, request_bytes=len(request)) as current:
+        queued = time.perf_counter()
+        with _model_slots:
+            started = time.perf_counter()
+            current.set(slot_wait_ms=round((started - queued) * 1000, 2))
+            try:
+                response = bedrock_client.invoke_model(
+                    modelId=model_id,
+                    body=request,
+                    contentType="application/json",
+                    accept="application/json",
+                )
+                raw = response["body"].read()
+                parsed = json.loads(raw.decode())
+            except Exception:
+                bedrock_request_duration.observe(time.perf_counter() - started, model_id, "invoke", "error")
+                raise
+            bedrock_request_duration.observe(time.perf_counter() - started, model_id, "invoke", "ok")
+
+        current.set(response_bytes=len(raw))
+        _record_tokens(model_id, parsed.get("usage") or {"input_tokens": parsed.get("inputTextTokenCount")}, current)
+    return parsed
+
+
+async def _run_in_executor(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(propagate(fn), *args, **kwargs))
+
+
+def _claude_body(system_prompt: str, user_input: str, max_tokens: int = 1000) -> dict:
+    return {
         "anthropic_version": "bedrock-2023-05-31",
-        "max_tokens": 1000,
+        "max_tokens": max_tokens,
         "temperature": 0.7,
-        "system": system_prompt,  
+        "system": system_prompt,
         "messages": [
             {"role": "user", "content": [{"type": "text", "text": user_input}]}
         ],
     }
 
-    try:
-        response = bedrock_client.invoke_model(
-            modelId=MODEL_ID,
-            body=json.dumps(body),
-            contentType="application/json",
-            accept="application/json",
-        )
 
-        raw = response["body"].read().decode()
-        parsed = json.loads(raw)
+# --- Claude Generation via signed HTTP request ---
+def call_claude(system_prompt: str, user_input: str) -> str:
+    body = _claude_body(system_prompt, user_input)
+
+    try:
+        parsed = _invoke_model(MODEL_ID, body)
         return parsed["content"][0]["text"].strip()
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Claude request failed: {str(e)}")
+        raise _to_http_exception(e, "Claude request")
 
 
-# --- Titan Embedding ---
-bedrock_client = boto3.client(
-    service_name="bedrock-runtime",
-    region_name=AWS_REGION,
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-)
+async def acall_claude(system_prompt: str, user_input: str) -> str:
+    """
+    Async entry point for call_claude; waits for a model slot without blocking the event loop.
+    """
+    return await _run_in_executor(call_claude, system_prompt, user_input)
 
 
-def fetch_embedding(text: str) -> list[float]:
+# --- Claude Generation, streamed ---
+def stream_claude(system_prompt: str, user_input: str, max_tokens: int = 1000):
     """
-    Fetch embedding using Amazon Titan model.
+    Yields Claude's completion as text chunks as soon as Bedrock produces them,
+    using the response-stream API instead of waiting for the full completion.
+    Closing the generator early closes the response stream and frees the model slot.
     """
-    if not text.strip():
-        raise HTTPException(status_code=400, detail="Input text is empty.")
+    body = _claude_body(system_prompt, user_input, max_tokens)
 
+    request = json.dumps(body)
+    status = "error"
+    started = time.perf_counter()
     try:
-        payload = {"inputText": text}
-        response = bedrock_client.invoke_model(
-            modelId="amazon.titan-embed-text-v2:0",
-            body=json.dumps(payload),
-            contentType="application/json",
-            accept="application/json",
-        )
-        body = response["body"].read().decode()
-        logging.info(f"Bedrock response body: {body}")
-        result = json.loads(body)
-
-        embedding = result.get("embedding")
-        if not embedding or not isinstance(embedding, list):
-            logging.error(f"Invalid embedding structure: {result}")
-            raise HTTPException(
-                status_code=500, detail="Embedding response invalid or missing."
+        with span("bedrock stream", model=MODEL_ID, request_bytes=len(request)) as current, _model_slots:
+            started = time.perf_counter()  # measured from here: waiting for a slot is not Bedrock latency
+            response = bedrock_client.invoke_model_with_response_stream(
+                modelId=MODEL_ID,
+                body=request,
+                contentType="application/json",
+                accept="application/json",
             )
 
-        return embedding
+            try:
+                for event in response["body"]:
+                    chunk = event.get("chunk")
+                    if not chunk:
+                        continue
+                    payload = json.loads(chunk["bytes"])
+                    if payload.get("type") == "content_block_delta" and payload["delta"].get("type") == "text_delta":
+                        yield payload["delta"]["text"]
+                    elif payload.get("type") == "message_start":
+                        current.set(first_event_ms=round((time.perf_counter() - started) * 1000, 2))
+                        _record_tokens(MODEL_ID, payload["message"].get("usage", {}), current)
+                    elif payload.get("type") == "message_delta":
+                        _record_tokens(MODEL_ID, payload.get("usage", {}), current)
+            finally:
+                response["body"].close()
+            status = "ok"
 
     except Exception as e:
-        logging.error(f"Embedding generation failed: {str(e)}")
+        raise _to_http_exception(e, "Claude streaming request")
+    finally:
+        # Full stream duration; a consumer that stops early is recorded as an error
+        bedrock_request_duration.observe(time.perf_counter() - started, MODEL_ID, "stream", status)
+
+
+async def astream_claude(system_prompt: str, user_input: str, max_tokens: int = 1000):
+    """
+    Async generator over stream_claude. The blocking stream is consumed on a worker
+    thread and handed to the event loop chunk by chunk. If the consumer is cancelled or
+    stops early, the worker stops at the next chunk and closes the stream.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    stop = threading.Event()
+
+    def pump():
+        stream = stream_claude(system_prompt, user_input, max_tokens)
+        try:
+            for text in stream:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, text)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            stream.close()  # no-op after a full read; otherwise closes the response and frees the slot
+            if not stop.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    _executor.submit(propagate(pump))
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+# --- Titan Embedding ---
+def _embed_uncached(text: str) -> np.ndarray:
+    """
+    One Titan request, returning the embedding as a float32 vector.
+    """
+    result = _invoke_model(EMBEDDING_MODEL_ID, {"inputText": text})
+
+    embedding = result.get("embedding")
+    if not embedding or not isinstance(embedding, list):
+        logging.error(f"Invalid embedding structure (keys: {sorted(result)})")
         raise HTTPException(
-            status_code=500, detail=f"Embedding generation failed: {str(e)}"
+            status_code=500, detail="Embedding response invalid or missing."
         )
+
+    logging.debug(f"Embedded {len(text)} chars into {len(embedding)} dims ({result.get('inputTextTokenCount')} tokens)")
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def _embed_and_store(text: str) -> np.ndarray:
+    vector = _embed_uncached(text)
+    if embedding_cache is not None:
+        vector = embedding_cache.put(embedding_cache.key(EMBEDDING_MODEL_ID, text), vector)
+    return vector
+
+
+def fetch_embeddings(texts: list[str], max_workers: int = EMBEDDING_BATCH_CONCURRENCY) -> list[np.ndarray]:
+    """
+    Fetch embeddings for many texts using Amazon Titan.
+
+    Identical texts are embedded once, texts already in the content-addressed cache cost no
+    request (their vectors are memory-mapped from disk), and the rest are embedded with at
+    most `max_workers` requests in flight.
+
+    Parameters:
+    - texts: Texts to embed; none may be empty.
+    - max_workers: Upper bound on concurrent requests for this batch.
+
+    Returns:
+    - One float32 vector per input text, in input order.
+    """
+    if any(not text.strip() for text in texts):
+        raise HTTPException(status_code=400, detail="Input text is empty.")
+
+    vectors, misses = {}, []
+    for text in dict.fromkeys(texts):
+        cached = embedding_cache.get(embedding_cache.key(EMBEDDING_MODEL_ID, text)) if embedding_cache is not None else None
+        if cached is not None:
+            vectors[text] = cached
+        else:
+            misses.append(text)
+    cache_event("embeddings", hit=not misses, cached=len(vectors), missing=len(misses))
+
+    try:
+        if len(misses) <= 1 or max_workers <= 1:
+            vectors.update((text, _embed_and_store(text)) for text in misses)
+        else:
+            batch_slots = threading.BoundedSemaphore(max_workers)
+
+            def embed_one(text: str) -> np.ndarray:
+                with batch_slots:
+                    return _embed_and_store(text)
+
+            vectors.update(zip(misses, _embedding_executor.map(propagate(embed_one), misses)))
+    except Exception as e:
+        logging.error(f"Embedding generation failed: {str(e)}")
+        raise _to_http_exception(e, "Embedding generation")
+
+    if misses:
+        logging.info(f"[Embeddings] {len(misses)} embedded, {len(vectors) - len(misses)} served from cache")
+    return [vectors[text] for text in texts]
+
+
+def fetch_embedding(text: str) -> list[float]:
+    """
+    Fetch embedding using Amazon Titan model.
+    """
+    return fetch_embeddings([text])[0].tolist()
+
+
+async def afetch_embedding(text: str) -> list[float]:
+    """
+    Async entry point for fetch_embedding.
+    """
+    return await _run_in_executor(fetch_embedding, text)
+
+
+async def afetch_embeddings(texts: list[str], max_workers: int = EMBEDDING_BATCH_CONCURRENCY) -> list[np.ndarray]:
+    """
+    Async entry point for fetch_embeddings.
+    """
+    return await _run_in_executor(fetch_embeddings, texts, max_workers)
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from utils.paths import CACHE_DIR
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk cache of embeddings. Each vector is stored as its own
+    float32 .npy file named after sha256(model id + text), sharded by hash prefix,
+    and read back memory-mapped so lookups copy nothing until the vector is used.
+
+    Writes go to a temp file and are renamed into place, so concurrent writers of the
+    same text are harmless and readers never see a partial file.
+
+    Texts change (every issue edit embeds a new one), so entries are pruned: files not read
+    or written for `max_age` seconds are deleted, then the least recently used ones until the
+    directory is under `max_bytes`. Writes trigger a prune on a background thread at most
+    once per `prune_interval` seconds; prune() can also be called directly.
+    """
+
+    def __init__(self, directory: str, max_age: float = 30 * 86400, max_bytes: int = 1 << 30, prune_interval: float = 3600):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._pruned_at = 0.0
+        self._prune_lock = threading.Lock()
+
+    @staticmethod
+    def key(model_id: str, text: str) -> str:
+        return hashlib.sha256(f"{model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        try:
+            vector = np.load(path, mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"[Embedding Cache] Ignoring unreadable entry {path}: {e}")
+            return None
+        try:
+            os.utime(path)  # marks the entry as recently used for prune()
+        except OSError:
+            pass  # read-only or shared cache directory: the entry ages by its write time instead
+        return vector
+
+    def put(self, key: str, vector) -> np.ndarray:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        array = np.asarray(vector, dtype=np.float32)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+        if time.monotonic() - self._pruned_at >= self.prune_interval:
+            self._pruned_at = time.monotonic()
+            threading.Thread(target=self.prune, name="embedding-cache-prune", daemon=True).start()
+        return array
+
+    def prune(self) -> int:
+        """
+        Deletes entries older than max_age, then the least recently used ones beyond max_bytes.
+        Returns the number of files removed.
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return 0  # a prune is already running
+        try:
+            entries = []
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            cutoff = time.time() - self.max_age
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for mtime, size, path in entries:
+                if mtime >= cutoff and total <= self.max_bytes:
+                    break
+                if path.endswith(".tmp.npy") and mtime >= cutoff:
+                    continue  # possibly still being written
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+
+            if removed:
+                logging.info(f"[Embedding Cache] Pruned {removed} entries; {total / 1e6:.1f} MB kept")
+            return removed
+        finally:
+            self._prune_lock.release()
+
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(CACHE_DIR, "embeddings"))
+# Entries unused this long are deleted, and the least recently used ones beyond the size bound
+EMBEDDING_CACHE_MAX_AGE = float(os.getenv("EMBEDDING_CACHE_MAX_AGE", str(30 * 86400)))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(1 << 30)))
+EMBEDDING_CACHE_PRUNE_INTERVAL = float(os.getenv("EMBEDDING_CACHE_PRUNE_INTERVAL", "3600"))
+
+embedding_cache = EmbeddingCache(
+    EMBEDDING_CACHE_DIR,
+    max_age=EMBEDDING_CACHE_MAX_AGE,
+    max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+    prune_interval=EMBEDDING_CACHE_PRUNE_INTERVAL,
+) if EMBEDDING_CACHE_ENABLED else None
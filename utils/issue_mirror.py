@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+# Columns search_advanced_issues can sort on locally; Jira orders status/priority/key by
+# workflow or rank rather than text, so those sorts always go to Jira
+SORTABLE_COLUMNS = {"created", "updated"}
+
+ROW_COLUMNS = [
+    "key", "project", "summary", "status", "priority", "assignee", "assignee_id",
+    "reporter", "issue_type", "created", "updated",
+]
+
+
+class IssueMirror:
+    """
+    Local SQLite copy of the issue fields used by the structured search tools, kept
+    current by delta syncs (see helpers.sync_issue_mirror).
+
+    `created`/`updated` are stored as Jira returns them (ISO 8601 with offset), so
+    comparisons against 'YYYY-MM-DD' bounds work on the string prefix and use the index.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS issues (
+                    key TEXT PRIMARY KEY,
+                    project TEXT NOT NULL,
+                    summary TEXT,
+                    status TEXT COLLATE NOCASE,
+                    priority TEXT COLLATE NOCASE,
+                    assignee TEXT COLLATE NOCASE,
+                    assignee_id TEXT COLLATE NOCASE,
+                    reporter TEXT,
+                    issue_type TEXT,
+                    created TEXT,
+                    updated TEXT
+                )
+                """
+            )
+            for column in ("project", "status", "priority", "assignee", "created", "updated"):
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_issues_{column} ON issues ({column})")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    project TEXT PRIMARY KEY,
+                    last_sync TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    full_synced_at REAL NOT NULL
+                )
+                """
+            )
+
+    def upsert(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in ROW_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO issues ({', '.join(ROW_COLUMNS)}) VALUES ({placeholders})",
+                [tuple(row[column] for column in ROW_COLUMNS) for row in rows],
+            )
+
+    def remove_missing(self, project: str, present_keys: set) -> int:
+        """
+        Deletes the project's issues that a full sync no longer saw (deleted or moved).
+        """
+        with self._lock, self._conn:
+            stored = [row[0] for row in self._conn.execute("SELECT key FROM issues WHERE project = ?", (project,))]
+            gone = [(key,) for key in stored if key not in present_keys]
+            self._conn.executemany("DELETE FROM issues WHERE key = ?", gone)
+        return len(gone)
+
+    def sync_state(self, project: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sync_state WHERE project = ?", (project,)).fetchone()
+        return dict(row) if row else None
+
+    def set_sync_state(self, project: str, last_sync: str, synced_at: float, full_synced_at: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (project, last_sync, synced_at, full_synced_at),
+            )
+
+    def search(
+        self,
+        projects: list[str],
+        statuses: list[str],
+        priorities: list[str],
+        assignees: list[str],
+        created_after: str,
+        updated_after: str,
+        sort_by: str,
+        order: str,
+        limit: int,
+    ) -> list[dict]:
+        """
+        Local equivalent of search_advanced_issues' JQL. Name filters are case-insensitive;
+        assignees match either the display name or the user name/account id.
+        """
+        if sort_by not in SORTABLE_COLUMNS or order not in ("ASC", "DESC"):
+            raise ValueError(f"Unsupported sort for the issue mirror: {sort_by} {order}")
+
+        where, params = [], []
+
+        def any_of(column: str, values: list[str]) -> None:
+            where.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+
+        if projects:
+            any_of("project", [p.upper() for p in projects])
+        if statuses:
+            any_of("status", statuses)
+        if priorities:
+            any_of("priority", priorities)
+        if assignees:
+            where.append(
+                f"(assignee IN ({', '.join('?' for _ in assignees)}) OR assignee_id IN ({', '.join('?' for _ in assignees)}))"
+            )
+            params.extend(assignees + assignees)
+        if created_after:
+            where.append("created >= ?")
+            params.append(created_after)
+        if updated_after:
+            where.append("updated >= ?")
+            params.append(updated_after)
+
+        sql = f"SELECT {', '.join(ROW_COLUMNS)} FROM issues"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {sort_by} {order}, key LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
@@ -0,0 +1,283 @@
+import asyncio
+import functools
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from dotenv import load_dotenv
+from jira import JIRA, JIRAError
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import jira_request_duration
+from utils.tracing import propagate, record_span, span, tracing_active
+from utils.upstream_scheduler import BULK, INTERACTIVE, UpstreamScheduler
+
+load_dotenv(override=True)
+
+JIRA_URL = os.getenv("JIRA_BASE_URL")
+JIRA_USER = os.getenv("JIRA_EMAIL")
+JIRA_TOKEN = os.getenv("JIRA_API_TOKEN")
+
+# Max Jira requests in flight at once, shared by every tool
+JIRA_MAX_CONCURRENCY = int(os.getenv("JIRA_MAX_CONCURRENCY", "8"))
+# Optional ceiling on Jira requests/second. Unset (the default), calls are not rate limited until
+# Jira first throttles (429/503); from then on throttling lowers the rate adaptively and successes
+# raise it again, with no ceiling unless JIRA_RATE_LIMIT is set
+JIRA_RATE_LIMIT = float(os.getenv("JIRA_RATE_LIMIT")) if os.getenv("JIRA_RATE_LIMIT") else None
+JIRA_RATE_BURST = float(os.getenv("JIRA_RATE_BURST", "10"))
+JIRA_MIN_RATE = float(os.getenv("JIRA_MIN_RATE", "0.5"))
+# Attempts per call when Jira throttles or is briefly unavailable
+JIRA_MAX_ATTEMPTS = int(os.getenv("JIRA_MAX_ATTEMPTS", "5"))
+# Bulk requests waiting longer than this go ahead of interactive ones
+JIRA_BULK_MAX_WAIT = float(os.getenv("JIRA_BULK_MAX_WAIT", "2"))
+RETRYABLE_STATUSES = {429, 503}
+# Identical read calls already in flight share one upstream request (single-flight)
+JIRA_SINGLE_FLIGHT = os.getenv("JIRA_SINGLE_FLIGHT", "true").lower() == "true"
+# Read-only client methods that are safe to coalesce; writes always go upstream individually
+COALESCED_METHODS = {
+    "issue", "search_issues", "projects", "project", "priorities", "statuses",
+    "issue_types", "transitions", "comments", "_get_json",
+}
+# Threads available for blocking work (Jira calls, LLM calls) started from async tools
+BLOCKING_EXECUTOR_WORKERS = int(os.getenv("BLOCKING_EXECUTOR_WORKERS", "32"))
+
+# max_retries=0: the client's own blind retries would bypass the scheduler below
+jira = JIRA(server=JIRA_URL, basic_auth=(JIRA_USER, JIRA_TOKEN), max_retries=0)
+
+# requests keeps only 10 pooled connections per host by default; size the pool to the concurrency limit
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=JIRA_MAX_CONCURRENCY)
+jira._session.mount("https://", _adapter)
+jira._session.mount("http://", _adapter)
+
+
+
+_ISSUE_KEY = re.compile(r"[A-Z][A-Z0-9_]*-\d+")
+
+
+def _endpoint(request) -> str:
+    """
+    Path template of a Jira request, with ids and keys replaced so metric labels stay bounded,
+    e.g. /rest/api/2/issue/DEV-1/comment -> /rest/api/2/issue/{key}/comment.
+    """
+    segments = request.path_url.split("?")[0].split("/")
+    for i, segment in enumerate(segments):
+        if segment.isdigit() and segments[i - 1] != "api":  # keep the API version in /rest/api/2/
+            segments[i] = "{id}"
+        elif _ISSUE_KEY.fullmatch(segment) or (segment and i and segments[i - 1] == "project"):
+            segments[i] = "{key}"
+    return "/".join(segments)
+
+
+def _observe_http(response, *args, **kwargs):
+    """
+    requests response hook: records the latency of each HTTP exchange with Jira.
+    """
+    request = response.request
+    jira_request_duration.observe(response.elapsed.total_seconds(), request.method, _endpoint(request), str(response.status_code))
+
+
+def _trace_http(response, *args, **kwargs):
+    """
+    requests response hook: records each HTTP exchange under the current span of a traced tool call.
+    """
+    if not tracing_active():
+        return
+    end_ns = time.time_ns()
+    request = response.request
+    record_span(
+        f"HTTP {request.method} {request.path_url.split('?')[0]}",
+        end_ns - int(response.elapsed.total_seconds() * 1e9),
+        end_ns,
+        **{
+            "http.status_code": response.status_code,
+            "http.request.bytes": len(request.path_url) + len(request.body or b""),
+            "http.response.bytes": len(response.content),
+        },
+    )
+
+
+jira._session.hooks["response"].extend([_observe_http, _trace_http])
+
+_jira_slots = threading.BoundedSemaphore(JIRA_MAX_CONCURRENCY)
+scheduler = UpstreamScheduler(
+    max_rate=JIRA_RATE_LIMIT,
+    burst=JIRA_RATE_BURST,
+    min_rate=JIRA_MIN_RATE,
+    bulk_max_wait=JIRA_BULK_MAX_WAIT,
+)
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_EXECUTOR_WORKERS, thread_name_prefix="blocking-io")
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_flights: dict = {}
+_flights_lock = threading.Lock()
+_stats = {"calls": 0, "upstream_calls": 0, "coalesced_calls": 0}
+
+
+def _retry_after(e: JIRAError) -> Optional[float]:
+    """
+    Seconds from a Retry-After header (delta-seconds or HTTP date), if Jira sent one.
+    """
+    response = getattr(e, "response", None)
+    header = response.headers.get("Retry-After") if response is not None else None
+    if not header:
+        return None
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _call_upstream(priority: int, method: str, args: tuple, kwargs: dict):
+    """
+    Sends one call through the scheduler, retrying throttled/unavailable responses after
+    the pause the scheduler derives from Retry-After (or its own backoff).
+    """
+    with span(f"jira {method}", priority="bulk" if priority == BULK else "interactive") as current:
+        waited = 0.0
+        for attempt in range(1, JIRA_MAX_ATTEMPTS + 1):
+            queued = time.perf_counter()
+            scheduler.acquire(priority)
+            waited += time.perf_counter() - queued
+            current.set(attempts=attempt, scheduler_wait_ms=round(waited * 1000, 2))
+            try:
+                with _jira_slots:
+                    with _flights_lock:
+                        _stats["upstream_calls"] += 1
+                    started = time.perf_counter()
+                    try:
+                        result = getattr(jira, method)(*args, **kwargs)
+                    except RequestException as e:
+                        # No response, so _observe_http never saw it (connection failure or timeout)
+                        if e.response is None and e.request is not None:
+                            jira_request_duration.observe(time.perf_counter() - started, e.request.method, _endpoint(e.request), "error")
+                        raise
+            except JIRAError as e:
+                if e.status_code not in RETRYABLE_STATUSES or attempt == JIRA_MAX_ATTEMPTS:
+                    raise
+                delay = scheduler.on_throttled(_retry_after(e))
+                current.add_event("throttled", status=e.status_code, retry_in_seconds=round(delay, 2))
+                logging.warning(f"[Jira] {method} got HTTP {e.status_code}; retry {attempt}/{JIRA_MAX_ATTEMPTS - 1} in {delay:.1f}s")
+                continue
+            scheduler.on_success()
+            return result
+
+
+def call_jira(method: str, *args, **kwargs):
+    """
+    Invokes a method of the shared JIRA client (e.g. call_jira("issue", "DEV-1")) as an
+    interactive request. Every call is admitted by the shared rate-limit scheduler, and at
+    most JIRA_MAX_CONCURRENCY requests run at once.
+
+    Concurrent calls of a read method with identical arguments are coalesced: the first
+    caller makes the request and the others wait for and share its result (or exception).
+    Shared results are the same objects, so callers must treat them as read-only.
+    """
+    return _call_jira(INTERACTIVE, method, args, kwargs)
+
+
+def call_jira_bulk(method: str, *args, **kwargs):
+    """
+    Same as call_jira, but scheduled behind interactive requests (pagination, background syncs).
+    """
+    return _call_jira(BULK, method, args, kwargs)
+
+
+def _call_jira(priority: int, method: str, args: tuple, kwargs: dict):
+    if not JIRA_SINGLE_FLIGHT or method not in COALESCED_METHODS:
+        with _flights_lock:
+            _stats["calls"] += 1
+        return _call_upstream(priority, method, args, kwargs)
+
+    key = repr((method, args, sorted(kwargs.items())))
+    with _flights_lock:
+        _stats["calls"] += 1
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+        else:
+            _stats["coalesced_calls"] += 1
+
+    if not leader:
+        with span(f"jira {method}", coalesced=True):
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _call_upstream(priority, method, args, kwargs)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]  # later callers start a fresh request
+        flight.done.set()
+
+
+def jira_client_stats() -> dict:
+    """
+    Counters for the shared Jira client: calls made by tools, requests actually sent to Jira,
+    calls answered by joining an identical in-flight request, and the rate-limit scheduler state.
+    """
+    with _flights_lock:
+        stats = dict(_stats)
+        stats["in_flight"] = len(_flights)
+    stats["coalesced_ratio"] = round(stats["coalesced_calls"] / stats["calls"], 3) if stats["calls"] else 0.0
+    stats["scheduler"] = scheduler.stats()
+    return stats
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """
+    Runs a blocking function in the shared bounded executor so the event loop
+    keeps serving other tool calls in the meantime.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(propagate(fn), *args, **kwargs))
+
+
+async def acall_jira(method: str, *args, **kwargs):
+    """
+    Async counterpart of call_jira for use inside async MCP tools.
+    """
+    return await run_blocking(call_jira, method, *args, **kwargs)
+
+
+async def map_bounded(fn, items, max_workers: int) -> list:
+    """
+    Awaits fn(item) for every item with at most max_workers running at once.
+    Results keep the input order. A failing item yields its exception in place
+    of a result so one bad item does not sink the whole batch.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run(item):
+        async with semaphore:
+            try:
+                return await fn(item)
+            except Exception as e:
+                return e
+
+    return await asyncio.gather(*(run(item) for item in items))
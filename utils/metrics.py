@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from fastmcp.server.middleware import Middleware
+
+# Prometheus text exposition format served by /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_registry = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """
+    Monotonic counter, one series per combination of label values (passed positionally,
+    in the order of `labelnames`).
+    """
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in sorted(values.items())]
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram over fixed `buckets` (upper bounds), one series per combination of label values.
+    Observing costs a lock and a binary search; quantiles are left to the Prometheus server.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = 'le="' + le + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, bucket)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _registry:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# --- MCP tools ---
+tool_calls = Counter("mcp_tool_calls_total", "Tool invocations.", ("tool",))
+tool_errors = Counter("mcp_tool_errors_total", "Tool invocations that raised or returned an error.", ("tool",))
+tool_duration = Histogram("mcp_tool_duration_seconds", "Tool latency.", ("tool",))
+tool_result_bytes = Histogram("mcp_tool_result_bytes", "Size of the serialized tool result.", ("tool",), SIZE_BUCKETS)
+
+# --- Upstream services ---
+jira_request_duration = Histogram(
+    "jira_request_duration_seconds", "Latency of requests sent to Jira, by HTTP method, endpoint path template and status.",
+    ("method", "endpoint", "status"),
+)
+bedrock_request_duration = Histogram(
+    "bedrock_request_duration_seconds", "Latency of Bedrock model invocations (including client-side retries).",
+    ("model", "operation", "status"),
+)
+bedrock_tokens = Counter("bedrock_tokens_total", "Tokens reported by Bedrock responses.", ("model", "direction"))
+
+
+class ToolMetricsMiddleware(Middleware):
+    """
+    Records call count, errors, latency and result size for every tool call. A result is an
+    error when the tool raised, when fastmcp marked it as one, or when it is a dict with an
+    'error' key (the convention tools here use to report failures without raising).
+    """
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        tool_calls.inc(tool)
+        started = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception:
+            tool_duration.observe(time.perf_counter() - started, tool)
+            tool_errors.inc(tool)
+            raise
+        tool_duration.observe(time.perf_counter() - started, tool)
+
+        structured = result.structured_content
+        if result.is_error or (isinstance(structured, dict) and "error" in structured):
+            tool_errors.inc(tool)
+        # The text blocks are what goes over the wire, so sizing them needs no extra serialization
+        size = sum(len(getattr(block, "text", "") or "") for block in result.content)
+        if not size and structured is not None:
+            size = len(json.dumps(structured, default=str))
+        tool_result_bytes.observe(size, tool)
+        return result
@@ -1,21 +1,239 @@
+import calendar
+import functools
 import json
 import logging
 import re
-from datetime import date
+from datetime import date, datetime, timedelta
+from typing import Optional
+
 from fastapi import HTTPException
 
 from utils.bedrock_wrapper import call_claude
+from utils.ttl_cache import TTLCache
 
 # Optional utility function (so it's reusable/testable)
 def get_today() -> date:
     return date.today()
 
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
+UNIT_ALIASES = {
+    "d": "day", "day": "day", "days": "day",
+    "w": "week", "week": "week", "weeks": "week",
+    "m": "month", "month": "month", "months": "month",
+    "q": "quarter", "quarter": "quarter", "quarters": "quarter",
+    "y": "year", "year": "year", "years": "year",
+}
+
+DAY_FORMATS = [
+    "%Y-%m-%d",         # 2025-07-01
+    "%Y/%m/%d",         # 2025/07/01
+    "%d/%m/%Y",         # 01/07/2025 (EU)
+    "%m/%d/%Y",         # 07/01/2025 (US)
+    "%d.%m.%Y",         # 01.07.2025
+    "%d %b %Y",         # 1 Jul 2025
+    "%d %B %Y",         # 1 July 2025
+    "%B %d %Y",         # July 1 2025 (commas are stripped)
+    "%b %d %Y",         # Jul 1 2025
+]
+
+MONTH_FORMATS = ["%Y-%m", "%B %Y", "%b %Y", "%Y %B", "%Y %b", "%m/%Y"]
+
+AMOUNT = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+UNIT = r"(" + "|".join(sorted(UNIT_ALIASES, key=len, reverse=True)) + r")"
+
+
+def _amount(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _shift(day: date, amount: int, unit: str) -> date:
+    """
+    Moves `day` back by `amount` units (calendar-aware for months, quarters and years).
+    """
+    if unit == "day":
+        return day - timedelta(days=amount)
+    if unit == "week":
+        return day - timedelta(weeks=amount)
+    if unit == "month":
+        return _add_months(day, -amount)
+    if unit == "quarter":
+        return _add_months(day, -3 * amount)
+    return _add_months(day, -12 * amount)
+
+
+def _period(day: date, unit: str, offset: int = 0) -> tuple[date, date]:
+    """
+    Returns (first, last) day of the calendar period containing `day`, shifted by `offset` periods.
+    Weeks start on Monday.
+    """
+    if unit == "day":
+        start = day + timedelta(days=offset)
+        return start, start
+    if unit == "week":
+        start = day - timedelta(days=day.weekday()) + timedelta(weeks=offset)
+        return start, start + timedelta(days=6)
+    months = {"month": 1, "quarter": 3, "year": 12}[unit]
+    first_month = (day.month - 1) // months * months + 1
+    start = _add_months(date(day.year, first_month, 1), offset * months)
+    end = _add_months(start, months) - timedelta(days=1)
+    return start, end
+
+
+def _parse_point(text: str, today: date) -> Optional[tuple[date, date]]:
+    """
+    Parses a single date expression into the (first, last) day it covers:
+    a day, a month ('June 2025'), a quarter ('Q2 2025'), a year ('2025') or a relative point ('3 days ago').
+    """
+    if text in ("today", "now"):
+        return today, today
+    if text == "yesterday":
+        day = today - timedelta(days=1)
+        return day, day
+
+    match = re.fullmatch(AMOUNT + r"\s*" + UNIT + r"(?:\s+ago)?", text)
+    if match:
+        day = _shift(today, _amount(match.group(1)), UNIT_ALIASES[match.group(2)])
+        return day, day
+
+    match = re.fullmatch(r"q([1-4])\s+(\d{4})|(\d{4})\s+q([1-4])", text)
+    if match:
+        quarter = int(match.group(1) or match.group(4))
+        year = int(match.group(2) or match.group(3))
+        return _period(date(year, 3 * quarter - 2, 1), "quarter")
+
+    if re.fullmatch(r"\d{4}", text):
+        return date(int(text), 1, 1), date(int(text), 12, 31)
+
+    for fmt in DAY_FORMATS:
+        try:
+            day = datetime.strptime(text, fmt).date()
+            return day, day
+        except ValueError:
+            continue
+
+    for fmt in MONTH_FORMATS:
+        try:
+            return _period(datetime.strptime(text, fmt).date(), "month")
+        except ValueError:
+            continue
+
+    return None
+
+
+def _bounds(time_from: Optional[date], time_to: Optional[date]) -> dict:
+    return {
+        "time_from": time_from.isoformat() if time_from else None,
+        "time_to": time_to.isoformat() if time_to else None,
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_time_range_locally(text: str, today: date) -> Optional[dict]:
+    """
+    Deterministic parser for common time range expressions. Returns None when the input
+    does not match the grammar, so the caller can fall back to the LLM.
+
+    Covers:
+    - Shorthands: -1w, 3d, -2m, -1y, and the spelled-out 2 weeks, three days
+    - Rolling windows: last two weeks, past 30 days, last 3 months
+    - Named periods: today, yesterday, this/last/next week|month|quarter|year, year to date
+    - Explicit ranges: 2025-01-12 to 2025-01-20, from Jan 2025 until Mar 2025, between X and Y
+    - Open-ended: before/older than X, after/newer than X, since X (X may be relative: 'older than 2 weeks')
+    - Single points: 2025-07-01, June 2025, Q2 2025, 2025, 2 weeks ago
+    """
+    # Shorthands and rolling windows end today. A bare amount and unit ('2 weeks') is the same
+    # window as its shorthand ('2w'); only '2 weeks ago' is a single day (handled by _parse_point)
+    match = re.fullmatch(r"-?(?:(\d+)\s*|(" + "|".join(NUMBER_WORDS) + r")\s+)" + UNIT, text)
+    if match:
+        return _bounds(_shift(today, _amount(match.group(1) or match.group(2)), UNIT_ALIASES[match.group(3)]), today)
+
+    match = re.fullmatch(r"(?:last|past|previous)\s+" + AMOUNT + r"\s+" + UNIT, text)
+    if match:
+        return _bounds(_shift(today, _amount(match.group(1)), UNIT_ALIASES[match.group(2)]), today)
+
+    match = re.fullmatch(r"past\s+" + UNIT, text)
+    if match:
+        return _bounds(_shift(today, 1, UNIT_ALIASES[match.group(1)]), today)
+
+    # Named calendar periods
+    match = re.fullmatch(r"(this|current|last|previous|next)\s+(week|month|quarter|year)", text)
+    if match:
+        offset = {"this": 0, "current": 0, "last": -1, "previous": -1, "next": 1}[match.group(1)]
+        return _bounds(*_period(today, match.group(2), offset))
+
+    match = re.fullmatch(r"(week|month|quarter|year)\s+to\s+date|([wmqy])td", text)
+    if match:
+        unit = match.group(1) or UNIT_ALIASES[match.group(2)]
+        return _bounds(_period(today, unit)[0], today)
+
+    # Open-ended ranges
+    match = re.fullmatch(r"(before|older than|earlier than|prior to)\s+(.+)", text)
+    if match:
+        point = _parse_point(match.group(2), today)
+        return _bounds(None, point[0] - timedelta(days=1)) if point else None
+
+    match = re.fullmatch(r"(after|newer than|later than)\s+(.+)", text)
+    if match:
+        point = _parse_point(match.group(2), today)
+        return _bounds(point[1] + timedelta(days=1), None) if point else None
+
+    match = re.fullmatch(r"(since|starting|starting from|from)\s+(.+)", text)
+    if match and not re.search(r"\s(to|until|till|through|-|and)\s", match.group(2)):
+        point = _parse_point(match.group(2), today)
+        return _bounds(point[0], None) if point else None
+
+    match = re.fullmatch(r"(until|till|up to)\s+(.+)", text)
+    if match:
+        point = _parse_point(match.group(2), today)
+        return _bounds(None, point[1]) if point else None
+
+    # Explicit ranges
+    match = re.fullmatch(r"(?:from\s+|between\s+)?(.+?)\s+(?:to|until|till|through|and|-|–)\s+(.+)", text)
+    if match:
+        start = _parse_point(match.group(1), today)
+        end = _parse_point(match.group(2), today)
+        if start and end:
+            return _bounds(start[0], end[1])
+        return None
+
+    point = _parse_point(text, today)
+    return _bounds(*point) if point else None
+
+
+# LLM answers for expressions outside the local grammar, keyed by (input, today)
+_llm_range_cache = TTLCache(maxsize=512, ttl=86400)
+
+
 def parse_time_range_to_bounds(input_str: str) -> dict:
     """
-    Uses Claude to convert a time range expression into structured time_from and time_to values (YYYY-MM-DD format).
+    Converts a time range expression into structured time_from and time_to values (YYYY-MM-DD format).
+    Common expressions are parsed locally; anything else is sent to Claude.
     """
 
-    today_str = str(get_today())
+    today = get_today()
+    normalized = " ".join(input_str.strip().lower().replace(",", " ").split())
+
+    local = _parse_time_range_locally(normalized, today)
+    if local is not None:
+        return dict(local)
+
+    cached = _llm_range_cache.get((normalized, today))
+    if cached is not None:
+        return dict(cached)
+
+    today_str = str(today)
     logging.info(f"[Time Range Parsing] Today is: {today_str}")
 
     system_prompt = f"""You are a helpful assistant converting human-readable time range expressions into structured date ranges.
@@ -62,7 +280,9 @@ Use today's date if needed for relative expressions. Return ONLY the JSON object
         if not (is_valid_date(time_from) and is_valid_date(time_to)):
             raise ValueError("Invalid date format in Claude output")
 
-        return {"time_from": time_from, "time_to": time_to}
+        bounds = {"time_from": time_from, "time_to": time_to}
+        _llm_range_cache.set((normalized, today), bounds)
+        return dict(bounds)
 
     except Exception as e:
         logging.error(f"Failed to parse Claude time range: {response_text}")
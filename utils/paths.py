@@ -0,0 +1,7 @@
+import os
+
+# Where persisted indexes and caches live; override with MCP_CACHE_DIR
+CACHE_DIR = os.getenv(
+    "MCP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
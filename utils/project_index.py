@@ -0,0 +1,117 @@
+import re
+from collections import defaultdict
+
+# Filler words users add around project names ("the nordea project")
+STOPWORDS = {"the", "a", "an", "project", "projects", "jira", "board", "for", "of", "and"}
+
+# A single candidate is accepted without the LLM when it scores at least this much...
+CONFIDENT_SCORE = 0.75
+# ...and beats the runner-up by at least this margin
+CONFIDENT_MARGIN = 0.15
+
+
+def normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in normalize(text).split() if t not in STOPWORDS]
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProjectIndex:
+    """
+    Precomputed lookup structures over Jira projects (exact keys, exact names,
+    name tokens and name trigrams) for resolving human input without an LLM call.
+
+    Lookups only touch projects that share a token or trigram with the input,
+    instead of scanning every project name like difflib does.
+    """
+
+    def __init__(self, projects: list[dict]):
+        self.projects = projects
+        self._by_key = {p["key"].upper(): i for i, p in enumerate(projects)}
+        self._by_name = defaultdict(list)
+        self._by_token = defaultdict(set)
+        self._by_trigram = defaultdict(set)
+        self._trigram_counts = []
+
+        for i, p in enumerate(projects):
+            self._by_name[normalize(p["name"])].append(i)
+            for token in tokenize(p["name"]) + [p["key"].lower()]:
+                self._by_token[token].add(i)
+            grams = trigrams(p["name"])
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._by_trigram[gram].add(i)
+
+    def exact(self, text: str):
+        """
+        Returns (path, keys) when the whole input, or else every comma-separated part of it,
+        is an exact project key or project name, otherwise None. The whole input is tried
+        first so names containing separators ("Research and Development") still match.
+        """
+        if text.strip().upper() in self._by_key:
+            return "exact_key", [self.projects[self._by_key[text.strip().upper()]]["key"]]
+        named = self._by_name.get(normalize(text), [])
+        if len(named) == 1:
+            return "exact_name", [self.projects[named[0]]["key"]]
+
+        parts = [part.strip() for part in re.split(r",|;|\band\b", text) if part.strip()]
+        if not parts:
+            return None
+
+        keys, path = [], "exact_key"
+        for part in parts:
+            if part.upper() in self._by_key:
+                keys.append(self.projects[self._by_key[part.upper()]]["key"])
+                continue
+            named = self._by_name.get(normalize(part), [])
+            if len(named) != 1:
+                return None
+            keys.append(self.projects[named[0]]["key"])
+            path = "exact_name"
+        return path, list(dict.fromkeys(keys))
+
+    def rank(self, text: str, limit: int = 10) -> list[tuple[dict, float]]:
+        """
+        Scores projects by trigram similarity (Dice coefficient) of their names to the input,
+        boosted when every meaningful input token occurs in the name or key.
+        """
+        grams = trigrams(text)
+        shared = defaultdict(int)
+        for gram in grams:
+            for i in self._by_trigram.get(gram, ()):
+                shared[i] += 1
+
+        tokens = tokenize(text)
+        token_hits = None
+        for token in tokens:
+            hits = self._by_token.get(token, set())
+            token_hits = hits if token_hits is None else token_hits & hits
+
+        scores = {
+            i: 2 * count / (len(grams) + self._trigram_counts[i])
+            for i, count in shared.items()
+        }
+        for i in token_hits or ():
+            scores[i] = max(scores.get(i, 0.0), 0.5) + 0.5 / len(token_hits)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self.projects[i], round(min(score, 1.0), 3)) for i, score in ranked]
+
+    def confident_match(self, ranked: list[tuple[dict, float]]):
+        """
+        Returns the top project when it clearly wins, otherwise None.
+        """
+        if not ranked:
+            return None
+        top_score = ranked[0][1]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if top_score >= CONFIDENT_SCORE and top_score - runner_up >= CONFIDENT_MARGIN:
+            return ranked[0][0]
+        return None
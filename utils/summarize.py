@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import logging
+import os
+import textwrap
+
+from utils.bedrock_wrapper import MODEL_ID, acall_claude
+from utils.jira_client import run_blocking
+from utils.paths import CACHE_DIR
+from utils.summary_cache import SummaryCache, executive_digest
+from utils.tracing import cache_event
+
+# Estimated input tokens per map call; longer tickets are split into chunks of this size
+MAP_TOKEN_BUDGET = int(os.getenv("SUMMARY_MAP_TOKEN_BUDGET", "6000"))
+# Estimated input tokens for the reduce step; more ticket summaries are reduced in groups first
+REDUCE_TOKEN_BUDGET = int(os.getenv("SUMMARY_REDUCE_TOKEN_BUDGET", "12000"))
+# Group-condensing rounds before the final reduce call goes ahead with whatever it has
+REDUCE_MAX_ROUNDS = int(os.getenv("SUMMARY_REDUCE_MAX_ROUNDS", "3"))
+
+TICKET_PROMPT = (
+    "You are an expert Jira analyst. The user will provide the raw data of a single Jira ticket "
+    "(or notes taken from parts of it), including summary, status, priority, description and comments.\n\n"
+    "Write a concise summary of the ticket in 2–4 sentences: what it is about, where it stands, "
+    "and any blockers or risks.\n"
+    "- Return ONLY the summary as plain text. Do not include markdown, headings, or the ticket key."
+)
+
+CHUNK_PROMPT = (
+    "You are an expert Jira analyst. The user will provide one part of a long Jira ticket.\n\n"
+    "Extract the important facts from this part: decisions, progress, blockers, risks, and who is involved.\n"
+    "- Return ONLY short plain-text notes. Do not include markdown."
+)
+
+REDUCE_PROMPT = (
+    "You are an expert Jira analyst. The user will provide short summaries of multiple Jira tickets, "
+    "each prefixed with its ticket key.\n\n"
+    "Write a high-level executive summary that captures important patterns, updates, progress, blockers, "
+    "or risks across all tickets. Mention ticket keys where relevant.\n"
+    "- Return ONLY the executive summary as plain text. Do not include markdown or JSON."
+)
+
+
+# Per-ticket summaries are persisted and reused until the ticket's `updated` timestamp changes
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", os.path.join(CACHE_DIR, "summaries.sqlite3"))
+EXECUTIVE_SUMMARY_MAX_AGE = int(os.getenv("EXECUTIVE_SUMMARY_MAX_AGE", str(30 * 86400)))
+
+# Changes whenever prompts, budgets or the model change, so stale summaries are never reused
+PROMPT_VERSION = hashlib.sha256(
+    "\x00".join([TICKET_PROMPT, CHUNK_PROMPT, REDUCE_PROMPT, str(MAP_TOKEN_BUDGET), MODEL_ID or ""]).encode()
+).hexdigest()[:16]
+
+summary_cache = SummaryCache(SUMMARY_CACHE_PATH) if SUMMARY_CACHE_ENABLED else None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English text); good enough for budgeting.
+    """
+    return len(text) // 4 + 1
+
+
+def split_by_tokens(text: str, budget: int) -> list[str]:
+    """
+    Splits text into chunks of at most `budget` estimated tokens, preferring line boundaries.
+    """
+    max_chars = budget * 4
+    chunks, current, current_len = [], [], 0
+
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:  # a single huge line (e.g. a pasted log) is hard-cut
+            if current:
+                chunks.append("".join(current))
+                current, current_len = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if current_len + len(line) > max_chars and current:
+            chunks.append("".join(current))
+            current, current_len = [], 0
+        current.append(line)
+        current_len += len(line)
+
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def group_by_tokens(entries: list[str], budget: int) -> list[list[str]]:
+    """
+    Packs whole entries, in order, into groups of at most `budget` estimated tokens.
+    An entry larger than the budget forms a group of its own rather than being split.
+    """
+    groups, current, current_tokens = [], [], 0
+    for entry in entries:
+        tokens = estimate_tokens(entry)
+        if current and current_tokens + tokens > budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(entry)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def format_ticket(ticket: dict) -> str:
+    return textwrap.dedent(f"""
+    Ticket {ticket['key']}:
+    Summary: {ticket.get('summary', '')}
+    Status: {ticket.get('status', '')}
+    Priority: {ticket.get('priority', '')}
+    Assignee: {ticket.get('assignee', '')}
+    Created: {ticket.get('created', '')}
+    Updated: {ticket.get('updated', '')}
+    """).strip() + f"\n\nDescription:\n{ticket.get('description', '')}\n\nComments:\n{ticket.get('comments', '')}"
+
+
+async def summarize_ticket(ticket: dict) -> str:
+    """
+    Map step for one ticket. Tickets within MAP_TOKEN_BUDGET take a single call; longer ones are
+    split into chunks that are condensed in parallel and then summarized together.
+    """
+    text = format_ticket(ticket)
+    if estimate_tokens(text) <= MAP_TOKEN_BUDGET:
+        return await acall_claude(TICKET_PROMPT, text)
+
+    chunks = split_by_tokens(text, MAP_TOKEN_BUDGET)
+    notes = await asyncio.gather(*(
+        acall_claude(CHUNK_PROMPT, f"Part {i} of {len(chunks)} of ticket {ticket['key']}:\n\n{chunk}")
+        for i, chunk in enumerate(chunks, start=1)
+    ))
+    combined = "\n\n".join(f"Notes from part {i}:\n{note}" for i, note in enumerate(notes, start=1))
+    return await acall_claude(TICKET_PROMPT, f"Ticket {ticket['key']} (condensed from {len(chunks)} parts):\n\n{combined}")
+
+
+async def reduce_summaries(ticket_summaries: dict, final_call=acall_claude) -> str:
+    """
+    Reduce step: builds the executive summary from per-ticket summaries. If they exceed
+    REDUCE_TOKEN_BUDGET they are first condensed group by group (in parallel, whole summaries
+    per group), for at most REDUCE_MAX_ROUNDS rounds. Every round must leave fewer entries
+    than it started with, so condensing that does not shrink the input stops early.
+    `final_call(system_prompt, user_input)` produces the final answer (e.g. a streaming call).
+    """
+    entries = [f"{key}: {summary}" for key, summary in ticket_summaries.items()]
+
+    for _ in range(REDUCE_MAX_ROUNDS):
+        if estimate_tokens("\n\n".join(entries)) <= REDUCE_TOKEN_BUDGET:
+            break
+        groups = group_by_tokens(entries, REDUCE_TOKEN_BUDGET)
+        if len(groups) >= len(entries):
+            break  # every entry already fills a group on its own
+        entries = await asyncio.gather(*(acall_claude(REDUCE_PROMPT, "\n\n".join(group)) for group in groups))
+
+    return await final_call(REDUCE_PROMPT, "\n\n".join(entries))
+
+
+async def summarize_tickets(tickets: list[dict], final_call=acall_claude, progress=None) -> dict:
+    """
+    Map-reduce summarization: per-ticket summaries are generated in parallel, then reduced
+    into an executive summary. Latency follows the longest ticket rather than the total input.
+
+    Tickets whose (key, updated, PROMPT_VERSION) is in the summary cache skip the LLM entirely,
+    and the executive summary is reused when none of its input summaries changed.
+
+    Parameters:
+    - tickets: Ticket dicts (key, summary, status, priority, assignee, created, updated, description, comments).
+    - final_call: Coroutine function used for the final reduce call.
+    - progress: Optional async callback(done, total, message) invoked as ticket summaries complete.
+
+    Returns:
+    - executive_summary, ticket_summaries (key -> summary), errors (key -> message) for failed
+      tickets, and cache (how many ticket summaries were reused vs. generated).
+    """
+    done = 0
+    cache_stats = {"ticket_hits": 0, "ticket_misses": 0, "executive_hit": False}
+
+    async def map_one(ticket: dict):
+        nonlocal done
+        updated = ticket.get("updated")
+        try:
+            if summary_cache is not None and updated:
+                cached = await run_blocking(summary_cache.get, ticket["key"], updated, PROMPT_VERSION)
+                cache_event("ticket_summary", hit=cached is not None, key=ticket["key"])
+                if cached is not None:
+                    cache_stats["ticket_hits"] += 1
+                    return cached
+
+            cache_stats["ticket_misses"] += 1
+            summary = await summarize_ticket(ticket)
+            if summary_cache is not None and updated:
+                await run_blocking(summary_cache.put, ticket["key"], updated, PROMPT_VERSION, summary)
+            return summary
+        except Exception as e:
+            logging.warning(f"[Summarize] Ticket {ticket['key']} failed: {e}")
+            return e
+        finally:
+            done += 1
+            if progress:
+                await progress(done, len(tickets), f"Summarized {ticket['key']}")
+
+    results = await asyncio.gather(*(map_one(t) for t in tickets))
+
+    ticket_summaries, errors = {}, {}
+    for ticket, result in zip(tickets, results):
+        if isinstance(result, Exception):
+            errors[ticket["key"]] = f"Failed to summarize ticket: {getattr(result, 'detail', result)}"
+        else:
+            ticket_summaries[ticket["key"]] = result
+
+    executive_summary = ""
+    if ticket_summaries:
+        digest = executive_digest(PROMPT_VERSION, ticket_summaries)
+        cached = await run_blocking(summary_cache.get_executive, digest) if summary_cache is not None else None
+        cache_event("executive_summary", hit=cached is not None)
+        if cached is not None:
+            cache_stats["executive_hit"] = True
+            executive_summary = cached
+        else:
+            executive_summary = await reduce_summaries(ticket_summaries, final_call)
+            if summary_cache is not None:
+                await run_blocking(summary_cache.put_executive, digest, executive_summary)
+                await run_blocking(summary_cache.prune_executive, EXECUTIVE_SUMMARY_MAX_AGE)
+
+    return {
+        "executive_summary": executive_summary,
+        "ticket_summaries": ticket_summaries,
+        "errors": errors,
+        "cache": cache_stats,
+    }
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class SummaryCache:
+    """
+    SQLite-backed store of per-ticket summaries keyed by (issue key, `updated` timestamp,
+    prompt version), plus executive summaries keyed by a digest of their inputs.
+
+    A ticket is only re-summarized when Jira reports a new `updated` value or the
+    prompts/model change; older rows for the same ticket are replaced on write.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ticket_summaries (
+                    issue_key TEXT NOT NULL,
+                    updated TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (issue_key, updated, prompt_version)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS executive_summaries (
+                    digest TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, issue_key: str, updated: str, prompt_version: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM ticket_summaries WHERE issue_key = ? AND updated = ? AND prompt_version = ?",
+                (issue_key, updated, prompt_version),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, issue_key: str, updated: str, prompt_version: str, summary: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM ticket_summaries WHERE issue_key = ?", (issue_key,))
+            self._conn.execute(
+                "INSERT INTO ticket_summaries VALUES (?, ?, ?, ?, ?)",
+                (issue_key, updated, prompt_version, summary, time.time()),
+            )
+
+    def get_executive(self, digest: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM executive_summaries WHERE digest = ?", (digest,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_executive(self, digest: str, summary: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO executive_summaries VALUES (?, ?, ?)",
+                (digest, summary, time.time()),
+            )
+
+    def prune_executive(self, max_age_seconds: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM executive_summaries WHERE created_at < ?", (time.time() - max_age_seconds,)
+            )
+
+
+def executive_digest(prompt_version: str, ticket_summaries: dict) -> str:
+    """
+    Digest of everything the executive summary depends on, so unchanged inputs reuse it.
+    """
+    h = hashlib.sha256(prompt_version.encode())
+    for key in sorted(ticket_summaries):
+        h.update(f"\x00{key}\x00{ticket_summaries[key]}".encode())
+    return h.hexdigest()
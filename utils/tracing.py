@@ -0,0 +1,261 @@
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware
+
+load_dotenv(override=True)
+
+# Opt-in per call: the `_trace` tool argument or this request header. "otlp" returns the trace in
+# OpenTelemetry (OTLP/JSON) form; any other truthy value ("1", "true", "tree") returns a span tree.
+TRACE_ARGUMENT = "_trace"
+TRACE_HEADER = "x-mcp-trace"
+# Optional OTLP/HTTP collector (e.g. http://localhost:4318/v1/traces) every recorded trace is also posted to
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "jira-mcp-server")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation in a traced tool call. Spans form a tree through `children`;
+    `events` are point-in-time annotations such as cache hits and misses.
+    """
+
+    __slots__ = ("name", "attributes", "events", "children", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id=None, attributes: dict = None, start_ns: int = None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.events = []
+        self.children = []
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes) -> None:
+        self.events.append((time.time_ns(), name, attributes))
+
+    def child(self, name: str, attributes: dict = None, start_ns: int = None) -> "Span":
+        span = Span(name, self.trace_id, self.span_id, attributes, start_ns)
+        self.children.append(span)  # list.append is atomic; children may finish on worker threads
+        return span
+
+
+class _NoopSpan:
+    """
+    Stands in for a span when the current call is not traced, so instrumented code needs no checks.
+    """
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def tracing_active() -> bool:
+    return _current_span.get() is not None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Records the enclosed block as a child of the current span. A no-op (yielding a span whose
+    methods do nothing) when the current tool call is not being traced.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield _NOOP_SPAN
+        return
+
+    current = parent.child(name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """
+    Adds an already finished operation (e.g. one HTTP exchange timed by the client library) under the current span.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        parent.child(name, attributes, start_ns).end_ns = end_ns
+
+
+def cache_event(cache: str, hit: bool, **attributes) -> None:
+    """
+    Notes a cache lookup on the current span.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        parent.add_event("cache.hit" if hit else "cache.miss", cache=cache, **attributes)
+
+
+def propagate(fn):
+    """
+    Binds fn to the caller's context, so work handed to a thread pool is recorded under the
+    caller's span (loop.run_in_executor and executor.submit do not carry contextvars over).
+    Every call runs in its own copy, so the wrapper can be used by several threads at once.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def span_tree(root: Span) -> dict:
+    """
+    The span and its descendants as nested dicts, with times in milliseconds from the span's start.
+    """
+    def node(current: Span) -> dict:
+        item = {
+            "name": current.name,
+            "start_ms": round((current.start_ns - root.start_ns) / 1e6, 2),
+            "duration_ms": round(((current.end_ns or time.time_ns()) - current.start_ns) / 1e6, 2),
+        }
+        if current.attributes:
+            item["attributes"] = current.attributes
+        if current.events:
+            item["events"] = [
+                {"name": name, "at_ms": round((at - root.start_ns) / 1e6, 2), **attributes}
+                for at, name, attributes in current.events
+            ]
+        if current.error:
+            item["error"] = current.error
+        if current.children:
+            item["children"] = [node(child) for child in sorted(current.children, key=lambda c: c.start_ns)]
+        return item
+
+    return node(root)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(root: Span) -> dict:
+    """
+    The trace as an OTLP/JSON ExportTraceServiceRequest, accepted by OpenTelemetry collectors
+    and most tracing backends.
+    """
+    spans, pending = [], [root]
+    while pending:
+        current = pending.pop()
+        pending.extend(current.children)
+        item = {
+            "traceId": current.trace_id,
+            "spanId": current.span_id,
+            "name": current.name,
+            "kind": 2 if current is root else 3,  # SERVER for the tool call, CLIENT for upstream calls
+            "startTimeUnixNano": str(current.start_ns),
+            "endTimeUnixNano": str(current.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(current.attributes),
+            "events": [
+                {"timeUnixNano": str(at), "name": name, "attributes": _otlp_attributes(attributes)}
+                for at, name, attributes in current.events
+            ],
+            "status": {"code": 2, "message": current.error} if current.error else {"code": 1},
+        }
+        if current.parent_id:
+            item["parentSpanId"] = current.parent_id
+        spans.append(item)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": TRACE_SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "jira-mcp-server.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def export_otlp(root: Span) -> None:
+    """
+    Posts the trace to TRACE_OTLP_ENDPOINT on a background thread; failures are only logged.
+    """
+    def post():
+        request = urllib.request.Request(
+            TRACE_OTLP_ENDPOINT,
+            data=json.dumps(to_otlp(root)).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            logging.warning(f"[Tracing] OTLP export failed: {e}")
+
+    threading.Thread(target=post, daemon=True).start()
+
+
+class TraceMiddleware(Middleware):
+    """
+    Records a span tree of every upstream call made while serving a tool call, when the caller
+    asks for it with the `_trace` argument or the x-mcp-trace header. The trace is returned in
+    the result's `_meta.trace` and, if TRACE_OTLP_ENDPOINT is set, exported there as well.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        arguments = context.message.arguments
+        requested = arguments.pop(TRACE_ARGUMENT, None) if arguments else None  # not a real tool parameter
+        if requested is None:
+            requested = get_http_headers().get(TRACE_HEADER)
+        mode = str(requested).lower() if requested is not None else ""
+        if mode in ("", "0", "false", "no", "off"):
+            return await call_next(context)
+
+        tool = context.message.name
+        root = Span(f"tool {tool}", secrets.token_hex(16), attributes={
+            "mcp.tool": tool,
+            "request.bytes": len(json.dumps(arguments or {}, default=str)),
+        })
+        token = _current_span.set(root)
+        try:
+            result = await call_next(context)
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            root.end_ns = time.time_ns()
+            _current_span.reset(token)
+            if TRACE_OTLP_ENDPOINT:
+                export_otlp(root)
+
+        result.meta = {**(result.meta or {}), "trace": to_otlp(root) if mode == "otlp" else span_tree(root)}
+        return result
@@ -0,0 +1,142 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+INTERACTIVE = 0
+BULK = 1
+
+
+class UpstreamScheduler:
+    """
+    Admission control for requests to a rate-limited upstream, shared by every caller.
+
+    - A token bucket refilled at `rate` requests/second (up to `burst` saved tokens).
+    - AIMD: each throttled response halves `rate` (down to `min_rate`) and pauses all
+      admissions until the upstream's Retry-After has passed; each success adds back
+      about `increase` requests/second per second, up to `max_rate`. The rate so settles
+      just below the point where the upstream starts throttling.
+    - With `max_rate=None` there is no limit until the first throttled response; the rate then
+      starts from half the rate admitted over the last second and AIMD runs without a ceiling.
+    - Interactive requests are admitted before bulk ones, but a bulk request that has
+      waited `bulk_max_wait` seconds goes next, so bulk jobs slow down rather than starve.
+
+    `clock` returns the current time in seconds; tests replace it to control time.
+    """
+
+    def __init__(self, max_rate: Optional[float], burst: float, min_rate: float = 0.5, increase: float = 0.5, bulk_max_wait: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_rate = max_rate
+        self.min_rate = min_rate if max_rate is None else min(min_rate, max_rate)
+        self.burst = max(1.0, burst)
+        self.increase = increase
+        self.bulk_max_wait = bulk_max_wait
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._rate = max_rate  # None: unlimited until the upstream first throttles
+        self._admitted_at = deque()  # admission times over the last second, while unlimited
+        self._tokens = self.burst
+        self._refilled_at = self._clock()
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._waiting = {INTERACTIVE: deque(), BULK: deque()}
+        self._stats = {"admitted": {INTERACTIVE: 0, BULK: 0}, "throttled": 0, "waited_seconds": 0.0}
+
+    def _refill(self, now: float) -> None:
+        if self._rate is None:
+            self._tokens = self.burst
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _next_in_line(self, now: float):
+        bulk = self._waiting[BULK]
+        if bulk and now - bulk[0][1] >= self.bulk_max_wait:
+            return bulk[0]
+        if self._waiting[INTERACTIVE]:
+            return self._waiting[INTERACTIVE][0]
+        return bulk[0] if bulk else None
+
+    def acquire(self, priority: int = INTERACTIVE) -> None:
+        """
+        Blocks until this request may be sent.
+        """
+        with self._cond:
+            enqueued = self._clock()
+            ticket = (object(), enqueued)
+            self._waiting[priority].append(ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    self._refill(now)
+                    if now >= self._paused_until and self._tokens >= 1 and self._next_in_line(now) is ticket:
+                        self._tokens -= 1
+                        if self._rate is None:
+                            self._admitted_at.append(now)
+                            while self._admitted_at[0] < now - 1:
+                                self._admitted_at.popleft()
+                        self._stats["admitted"][priority] += 1
+                        self._stats["waited_seconds"] += now - enqueued
+                        return
+
+                    if now < self._paused_until:
+                        timeout = self._paused_until - now
+                    elif self._tokens < 1:
+                        timeout = (1 - self._tokens) / self._rate
+                    else:
+                        timeout = self.bulk_max_wait  # not our turn; woken when the queue moves
+                    promoted_at = enqueued + self.bulk_max_wait
+                    if priority == BULK and now < promoted_at:
+                        timeout = min(timeout, promoted_at - now)
+                    self._cond.wait(timeout)
+            finally:
+                self._waiting[priority].remove(ticket)
+                self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._consecutive_throttles = 0
+            if self._rate is None:
+                return
+            self._rate += self.increase / self._rate
+            if self.max_rate is not None:
+                self._rate = min(self.max_rate, self._rate)
+
+    def on_throttled(self, retry_after: Optional[float]) -> float:
+        """
+        Records a throttled response and returns how long the caller should wait before retrying.
+        Without a Retry-After header the pause backs off exponentially (with jitter) over
+        consecutive throttled responses.
+        """
+        with self._cond:
+            now = self._clock()
+            self._stats["throttled"] += 1
+            self._consecutive_throttles += 1
+            if self._rate is None:  # first throttle while unlimited: start from what was being sent
+                self._rate = max(self.min_rate, float(sum(1 for t in self._admitted_at if t >= now - 1)))
+                self._admitted_at.clear()
+            if now >= self._paused_until:  # requests already in flight when we got throttled count once
+                self._rate = max(self.min_rate, self._rate / 2)
+            self._tokens = 0.0
+            self._refilled_at = now
+            if retry_after is None:
+                retry_after = random.uniform(0.5, 1.0) * min(30.0, 0.5 * 2 ** self._consecutive_throttles)
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._cond.notify_all()
+            return self._paused_until - now
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rate_per_second": round(self._rate, 2) if self._rate is not None else None,
+                "max_rate_per_second": self.max_rate,
+                "paused_seconds": round(max(0.0, self._paused_until - self._clock()), 2),
+                "waiting_interactive": len(self._waiting[INTERACTIVE]),
+                "waiting_bulk": len(self._waiting[BULK]),
+                "admitted_interactive": self._stats["admitted"][INTERACTIVE],
+                "admitted_bulk": self._stats["admitted"][BULK],
+                "throttled": self._stats["throttled"],
+                "waited_seconds": round(self._stats["waited_seconds"], 2),
+            }
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from utils.paths import CACHE_DIR
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """
+    Embedding index persisted as a float32 .npy matrix of L2-normalized rows plus a
+    JSON sidecar with row keys, content hashes and free-form `meta` state.
+
+    The matrix is memory-mapped read-only on load. Updates only re-embed items whose
+    text hash changed, then atomically rewrite both files and re-map the matrix.
+    """
+
+    def __init__(self, name: str, directory: str = CACHE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self._matrix_path = os.path.join(directory, f"{name}.npy")
+        self._sidecar_path = os.path.join(directory, f"{name}.json")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._snapshot = (None, [])
+        self.keys: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._hashes: dict[str, str] = {}
+        self.meta: dict = {}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _load(self) -> None:
+        if not (os.path.exists(self._matrix_path) and os.path.exists(self._sidecar_path)):
+            return
+        try:
+            with open(self._sidecar_path) as f:
+                sidecar = json.load(f)
+            matrix = np.load(self._matrix_path, mmap_mode="r")
+            if matrix.shape[0] != len(sidecar["keys"]):
+                raise ValueError(f"{matrix.shape[0]} rows but {len(sidecar['keys'])} keys")
+        except Exception as e:
+            logging.warning(f"[Vector Index] Ignoring unreadable index '{self.name}': {e}")
+            return
+
+        self._set_state(matrix, sidecar["keys"], sidecar["hashes"], sidecar.get("meta", {}))
+
+    def _set_state(self, matrix, keys: list[str], hashes: list[str], meta: dict) -> None:
+        self._matrix = matrix
+        self.keys = list(keys)
+        self._rows = {key: i for i, key in enumerate(self.keys)}
+        self._hashes = dict(zip(self.keys, hashes))
+        self.meta = meta
+        self._snapshot = (matrix, self.keys)  # swapped as one reference so readers never see a torn update
+
+    def _persist(self, matrix: np.ndarray, keys: list[str], hashes: list[str]) -> None:
+        tmp_matrix = self._matrix_path + ".tmp.npy"
+        tmp_sidecar = self._sidecar_path + ".tmp"
+        np.save(tmp_matrix, matrix)
+        with open(tmp_sidecar, "w") as f:
+            json.dump({"keys": keys, "hashes": hashes, "meta": self.meta}, f)
+        os.replace(tmp_matrix, self._matrix_path)
+        os.replace(tmp_sidecar, self._sidecar_path)
+        self._set_state(np.load(self._matrix_path, mmap_mode="r"), keys, hashes, self.meta)
+
+    def update(self, items: dict, embed_many, remove=(), replace_all: bool = False) -> dict:
+        """
+        Adds or refreshes items (key -> text) and drops removed keys.
+
+        Parameters:
+        - items: Texts to index, keyed by item key.
+        - embed_many: Callable taking a list of texts and returning one vector per text.
+        - remove: Keys to drop from the index.
+        - replace_all: Also drop every indexed key that is not in `items`.
+
+        Returns counts of embedded, removed and unchanged items.
+        """
+        with self._lock:
+            hashes = {key: content_hash(text) for key, text in items.items()}
+            changed = [key for key, h in hashes.items() if self._hashes.get(key) != h]
+            drop = set(remove) | (set(self.keys) - set(items) if replace_all else set())
+            drop &= set(self.keys)
+            stats = {"embedded": len(changed), "removed": len(drop), "unchanged": len(items) - len(changed)}
+            if not changed and not drop:
+                return stats
+
+        # Embedding is the slow part and runs unlocked, so updates of other keys are not held up
+        new_rows = _normalize_rows(embed_many([items[key] for key in changed])) if changed else None
+
+        with self._lock:
+            changed_set = set(changed)
+            keep = [key for key in self.keys if key not in drop and key not in changed_set]
+            parts = []
+            if keep:
+                parts.append(np.asarray(self._matrix[[self._rows[key] for key in keep]], dtype=np.float32))
+            if new_rows is not None:
+                parts.append(new_rows)
+
+            if parts:
+                matrix = np.vstack(parts)
+            else:
+                dim = self._matrix.shape[1] if self._matrix is not None else 0
+                matrix = np.zeros((0, dim), dtype=np.float32)
+            keys = keep + changed
+            self._persist(matrix, keys, [self._hashes[key] for key in keep] + [hashes[key] for key in changed])
+            return stats
+
+    def save_meta(self) -> None:
+        """
+        Persists `meta` without touching the vectors.
+        """
+        with self._lock:
+            tmp_sidecar = self._sidecar_path + ".tmp"
+            with open(tmp_sidecar, "w") as f:
+                json.dump({"keys": self.keys, "hashes": [self._hashes[k] for k in self.keys], "meta": self.meta}, f)
+            if self._matrix is None:
+                np.save(self._matrix_path + ".tmp.npy", np.zeros((0, 0), dtype=np.float32))
+                os.replace(self._matrix_path + ".tmp.npy", self._matrix_path)
+            os.replace(tmp_sidecar, self._sidecar_path)
+
+    def query(self, vector, k: int = 5, key_filter=None) -> list[tuple[str, float]]:
+        """
+        Returns the top-k (key, cosine similarity) pairs, optionally restricted to keys
+        for which `key_filter(key)` is true.
+        """
+        matrix, keys = self._snapshot
+        if matrix is None or not keys:
+            return []
+
+        scores = matrix @ _normalize_rows(vector)[0]
+        if key_filter is not None:
+            row_mask = np.fromiter((key_filter(key) for key in keys), dtype=bool, count=len(keys))
+            scores = np.where(row_mask, scores, -np.inf)
+
+        k = min(k, len(keys))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(keys[i], float(scores[i])) for i in top if np.isfinite(scores[i])]